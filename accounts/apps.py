@@ -6,11 +6,54 @@ class AccountsConfig(AppConfig):
     name = "accounts"
 
     def ready(self):
-        from django.db.models.signals import post_migrate
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.models import Group
+        from django.db.models.signals import (
+            m2m_changed,
+            post_delete,
+            post_migrate,
+            post_save,
+            pre_delete,
+        )
+
+        from core.utils.images import image_processed
 
-        from .signals import ensure_default_groups
+        from . import signals
+        from .models import Profile
 
         post_migrate.connect(
-            ensure_default_groups,
+            signals.ensure_default_groups,
             dispatch_uid="accounts.ensure_default_groups",
         )
+
+        user_model = get_user_model()
+        for signal, name in (
+            (post_save, "saved"),
+            (post_delete, "deleted"),
+            (image_processed, "image_processed"),
+        ):
+            signal.connect(
+                signals.profile_changed,
+                sender=Profile,
+                dispatch_uid=f"accounts.chrome.profile_{name}",
+            )
+        post_save.connect(
+            signals.user_changed,
+            sender=user_model,
+            dispatch_uid="accounts.chrome.user_saved",
+        )
+        m2m_changed.connect(
+            signals.user_groups_changed,
+            sender=user_model.groups.through,
+            dispatch_uid="accounts.roles.user_groups_changed",
+        )
+        post_save.connect(
+            signals.group_changed,
+            sender=Group,
+            dispatch_uid="accounts.roles.group_saved",
+        )
+        pre_delete.connect(
+            signals.group_changed,
+            sender=Group,
+            dispatch_uid="accounts.roles.group_deleting",
+        )
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from cart.models import Cart
+from core.utils.cache import bump_version_on_commit, versioned_key
+from core.utils.media import image_url
+
+from .models import Profile
+from .roles import is_manager
+
+CHROME_CACHE_TIMEOUT = 300
+
+
+def chrome_namespace(user_id):
+    return f"chrome:{user_id}"
+
+
+def bump_chrome_version(user_id):
+    bump_version_on_commit(chrome_namespace(user_id))
+
+
+def default_avatar_url():
+    return f"{settings.STATIC_URL}images/avatar.png"
+
+
+def build_chrome_context(user):
+    # Counters are kept on the Cart and Profile rows, so this reads two rows and aggregates nothing.
+    profile = Profile.objects.filter(user=user).only("avatar", "favorites_count").first()
+    cart = Cart.objects.filter(user=user).values("line_count", "total").first() or {}
+    avatar = image_url(profile.avatar, "thumbnail") if profile and profile.avatar else ""
+    return {
+        "avatar_url": avatar or default_avatar_url(),
+        "is_manager": is_manager(user),
+        "cart_count": cart.get("line_count", 0),
+        "cart_total": cart.get("total", Decimal("0")),
+        "favorites_count": profile.favorites_count if profile else 0,
+    }
+
+
+def get_chrome_context(user):
+    if not getattr(user, "is_authenticated", False):
+        return None
+    key = versioned_key(chrome_namespace(user.pk), "context")
+    context = cache.get(key)
+    if context is None:
+        context = build_chrome_context(user)
+        cache.set(key, context, CHROME_CACHE_TIMEOUT)
+    return context
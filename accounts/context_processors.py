@@ -0,0 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+from cart.anonymous import get_anonymous_cart
+
+from .chrome import get_chrome_context
+
+
+def _chrome(request):
+    user = getattr(request, "user", None)
+    context = get_chrome_context(user)
+    if context is None:
+        context = {"cart_count": len(get_anonymous_cart(request))}
+    return context
+
+
+def chrome(request):
+    return {"chrome": SimpleLazyObject(lambda: _chrome(request))}
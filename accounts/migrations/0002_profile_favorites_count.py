@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_favorites_count(apps, schema_editor):
+    Profile = apps.get_model("accounts", "Profile")
+    Favorite = apps.get_model("favorites", "Favorite")
+
+    favorites = Favorite.objects.filter(user=OuterRef("user")).order_by().values("user")
+    Profile.objects.update(
+        favorites_count=Coalesce(
+            Subquery(favorites.annotate(total=Count("id")).values("total")[:1]),
+            Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("favorites", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="favorites_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_favorites_count, migrations.RunPython.noop),
+    ]
@@ -7,6 +7,7 @@ class Profile(models.Model):
     display_name = models.CharField(max_length=120)
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
     bio = models.TextField(blank=True)
+    favorites_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.display_name
@@ -0,0 +1,35 @@
+from django.core.cache import cache
+
+from core.utils.cache import bump_version_on_commit, versioned_key
+
+MANAGER_GROUP = "manager"
+ROLE_CACHE_TIMEOUT = 300
+
+
+def role_namespace(user_id):
+    return f"roles:{user_id}"
+
+
+def bump_role_version(user_id):
+    bump_version_on_commit(role_namespace(user_id))
+
+
+def user_roles(user):
+    if not getattr(user, "is_authenticated", False):
+        return frozenset()
+    # request.user lives for one request, so this also memoizes per request.
+    roles = getattr(user, "_roles", None)
+    if roles is None:
+        key = versioned_key(role_namespace(user.pk), "groups")
+        roles = cache.get(key)
+        if roles is None:
+            roles = frozenset(user.groups.values_list("name", flat=True))
+            cache.set(key, roles, ROLE_CACHE_TIMEOUT)
+        user._roles = roles
+    return roles
+
+
+def is_manager(user):
+    if not getattr(user, "is_authenticated", False):
+        return False
+    return user.is_superuser or MANAGER_GROUP in user_roles(user)
@@ -1,5 +1,8 @@
 from django.contrib.auth.models import Group, Permission
 
+from .chrome import bump_chrome_version
+from .roles import bump_role_version
+
 
 def ensure_default_groups(sender, **kwargs):
     Group.objects.get_or_create(name="client")
@@ -16,3 +19,40 @@ def ensure_default_groups(sender, **kwargs):
         ],
     )
     manager_group.permissions.add(*manager_permissions)
+
+
+def _bump_users(user_ids):
+    for user_id in set(user_ids):
+        bump_role_version(user_id)
+        bump_chrome_version(user_id)
+
+
+def profile_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_chrome_version(instance.user_id)
+
+
+def user_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_chrome_version(instance.pk)
+
+
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    # Forward changes touch one user; reverse changes touch pk_set, or every member on clear.
+    if not reverse:
+        _bump_users([instance.pk])
+    elif action == "pre_clear":
+        _bump_users(instance.user_set.values_list("pk", flat=True))
+    else:
+        _bump_users(pk_set or ())
+
+
+def group_changed(sender, instance, raw=False, **kwargs):
+    # A renamed or deleted group changes the role names of all its members.
+    if raw or instance.pk is None:
+        return
+    _bump_users(instance.user_set.values_list("pk", flat=True))
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.roles import is_manager
+from catalog.models import Game
+
+
+class RoleResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager_group = Group.objects.get(name="manager")
+        self.user = User.objects.create_user("member", password="secret")
+
+    def fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_memoized_per_request_and_cached_per_user(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            self.assertFalse(is_manager(user))
+            self.assertFalse(is_manager(user))
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertFalse(is_manager(user))
+
+    def test_group_changes_invalidate(self):
+        self.assertFalse(is_manager(self.fresh_user()))
+
+        self.user.groups.add(self.manager_group)
+        self.assertTrue(is_manager(self.fresh_user()))
+
+        self.manager_group.user_set.remove(self.user)
+        self.assertFalse(is_manager(self.fresh_user()))
+
+        self.manager_group.user_set.add(self.user)
+        self.assertTrue(is_manager(self.fresh_user()))
+
+        self.manager_group.user_set.clear()
+        self.assertFalse(is_manager(self.fresh_user()))
+
+        self.user.groups.add(self.manager_group)
+        self.manager_group.name = "former-manager"
+        self.manager_group.save()
+        self.assertFalse(is_manager(self.fresh_user()))
+
+    def test_superuser_and_anonymous_skip_queries(self):
+        superuser = User.objects.create_superuser("admin", password="secret")
+        with self.assertNumQueries(0):
+            self.assertTrue(is_manager(superuser))
+            self.assertFalse(is_manager(None))
+
+    def test_manager_checks_reuse_cached_roles(self):
+        Game.objects.create(title="Game", description="x", price=Decimal("9.99"), release_year=2020)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.delete("/api/games/game/").status_code, 403)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.delete("/api/games/game/").status_code, 403)
+            self.assertEqual(self.client.get("/manage/orders/").status_code, 403)
+        self.assertFalse([query for query in queries if "auth_user_groups" in query["sql"]])
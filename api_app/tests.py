@@ -1,2 +1,93 @@
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Game
+from reviews.models import Review
+from reviews.writes import upsert_review
+
+
+class GameDetailETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("reviewer", password="secret")
+        self.game = Game.objects.create(
+            title="Game", description="x", price=Decimal("9.99"), release_year=2020
+        )
+        self.url = reverse("api_app:api_game_detail", args=[self.game.slug])
+
+    def assertStale(self, etag):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_unchanged_game_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_text_only_review_edits_change_the_etag(self):
+        upsert_review(self.user, self.game, 4, "first")
+        etag = self.client.get(self.url)["ETag"]
+
+        upsert_review(self.user, self.game, 4, "edited")
+        etag = self.assertStale(etag)
+        self.assertEqual(
+            self.client.get(self.url).json()["data"]["recent_reviews"][0]["text"], "edited"
+        )
+
+        review = Review.objects.get(user=self.user, game=self.game)
+        review.text = "edited again"
+        review.save()
+        etag = self.assertStale(etag)
+
+        review.delete()
+        self.assertStale(etag)
+
+    def test_text_only_review_edits_move_last_modified(self):
+        upsert_review(self.user, self.game, 4, "first")
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304
+        )
+
+        later = time.time() + 60
+        with mock.patch("core.utils.cache.time.time", return_value=later):
+            upsert_review(self.user, self.game, 4, "edited")
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["recent_reviews"][0]["text"], "edited")
+
+    def test_game_row_changes_the_etag_without_a_version_bump(self):
+        etag = self.client.get(self.url)["ETag"]
+        Game.objects.filter(pk=self.game.pk).update(title="Renamed", updated_at=timezone.now())
+        self.assertStale(etag)
+
+
+class GamesBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.games = [
+            Game.objects.create(
+                title=f"Game {index}", description="x", price=Decimal("9.99"), release_year=2020
+            )
+            for index in range(3)
+        ]
+        self.url = reverse("api_app:api_games_batch")
 
+    def test_game_requested_by_slug_and_id_is_returned_once(self):
+        first, second, third = self.games
+        params = {"slugs": f"{second.slug},{first.slug}", "ids": f"{first.pk},{third.pk},999"}
+        self.client.get(self.url, params)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, params)
+        data = response.json()["data"]
+        self.assertEqual(
+            [item["slug"] for item in data["items"]], [second.slug, first.slug, third.slug]
+        )
+        self.assertEqual(data["missing"], {"slugs": [], "ids": [999]})
@@ -7,9 +7,15 @@ app_name = "api_app"
 urlpatterns = [
     path("health/", views.health, name="api_health"),
     path("games/", views.games_list, name="api_games_list"),
+    path("games/export/", views.games_export, name="api_games_export"),
+    path("games/batch/", views.games_batch, name="api_games_batch"),
     path("games/<slug:slug>/", views.game_detail, name="api_game_detail"),
     path("genres/", views.genres_list, name="api_genres_list"),
     path("platforms/", views.platforms_list, name="api_platforms_list"),
+    path("cart/", views.cart, name="api_cart"),
+    path("orders/", views.orders_list, name="api_orders_list"),
     path("games/<slug:slug>/favorite/", views.favorite_toggle, name="api_favorite_toggle"),
+    path("games/<slug:slug>/overlay/", views.game_overlay, name="api_game_overlay"),
+    path("games/<slug:slug>/reviews/", views.game_reviews, name="api_game_reviews"),
     path("games/<slug:slug>/review/", views.review_dispatch, name="api_review_dispatch"),
 ]
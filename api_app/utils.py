@@ -2,6 +2,8 @@ import json
 
 from django.http import JsonResponse
 
+from accounts.roles import is_manager
+
 
 def json_ok(data=None, status=200):
     return JsonResponse(
@@ -51,6 +53,6 @@ def ensure_manager(request):
     user = request.user
     if not user.is_authenticated:
         return json_error("Authentication required.", status=401)
-    if user.is_superuser or user.groups.filter(name="manager").exists():
+    if is_manager(user):
         return None
     return json_error("Permission denied.", status=403)
@@ -1,16 +1,37 @@
 import json
 from decimal import Decimal
 
-from django.core.paginator import Paginator
-from django.db.models import Avg, Count, OuterRef, Subquery
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
-
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition, require_http_methods
+
+from accounts.roles import is_manager
+from cart.writes import CART_OPERATIONS, apply_cart_operations, cart_state
+from catalog.cache import catalog_changed_at, catalog_version, snapshot_changed_at, snapshot_version
+from catalog.export import gzip_stream, iter_ndjson
+from catalog.facets import facet_counts
 from catalog.models import Game
+from catalog.pagination import RELEVANCE_GAME_SORT, keyset_paginate, resolve_game_sort
+from catalog.search import search_games, search_page
+from catalog.snapshot import snapshot_page
+from core.utils.cache import LOOKUP_CACHE_TIMEOUT, cached_lookup, versioned_key
+from core.utils.media import prefetch_image_urls
 from favorites.models import Favorite
+from favorites.writes import toggle_favorite
+from orders.history import order_history_page
+from reviews.cache import reviews_changed_at, reviews_version
+from reviews.feed import own_review, resolve_review_sort, review_page, serialize_review
 from reviews.models import Review
+from reviews.writes import upsert_review
+from taxonomy.cache import TAXONOMY_NAMESPACE, taxonomy_changed_at, taxonomy_version
 from taxonomy.models import Genre, Platform
 
+BATCH_MAX_GAMES = 300
+CART_MAX_OPERATIONS = 50
+
 
 def _json_ok(data=None, status=200):
     return JsonResponse({"ok": True, "data": data, "error": None}, status=status)
@@ -20,6 +41,74 @@ def _json_error(error, status=400, data=None):
     return JsonResponse({"ok": False, "data": data, "error": error}, status=status)
 
 
+def _cached_lookup_response(namespace, model):
+    # The serialized envelope is cached too, so a hit skips both the DB and json.dumps.
+    key = versioned_key(namespace, "api", model._meta.label_lower)
+    payload = cache.get(key)
+    if payload is None:
+        items = cached_lookup(namespace, model)
+        data = [{"name": item["name"], "slug": item["slug"]} for item in items]
+        payload = json.dumps({"ok": True, "data": data, "error": None}).encode("utf-8")
+        cache.set(key, payload, LOOKUP_CACHE_TIMEOUT)
+    return HttpResponse(payload, content_type="application/json")
+
+
+# Validators come from the version counters, so a 304 is answered without touching the DB.
+# Listings are served from the snapshot, so its version is part of theirs.
+def _catalog_etag(request, *args, **kwargs):
+    return f"catalog-{catalog_version()}-s{snapshot_version()}"
+
+
+def _game_validators(request, slug):
+    # Read once per request for both validators.
+    if not hasattr(request, "_game_validators"):
+        request._game_validators = (
+            Game.objects.filter(slug=slug).values_list("pk", "updated_at").first()
+        )
+    return request._game_validators
+
+
+def _game_etag(request, slug):
+    # The row timestamp covers the game's own fields, the review version covers
+    # recent_reviews (including text-only edits), the catalog version related names.
+    game = _game_validators(request, slug)
+    if game is None:
+        return None
+    game_id, updated_at = game
+    return (
+        f"game-{slug}-{updated_at.timestamp()}-r{reviews_version(game_id)}-c{catalog_version()}"
+    )
+
+
+def _game_last_modified(request, slug):
+    game = _game_validators(request, slug)
+    if game is None:
+        return None
+    game_id, updated_at = game
+    return max(updated_at, reviews_changed_at(game_id), catalog_changed_at())
+
+
+def _wants_gzip(request):
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+
+def _export_etag(request):
+    encoding = "gzip" if _wants_gzip(request) else "identity"
+    return f"catalog-{catalog_version()}-s{snapshot_version()}-{encoding}"
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    return max(catalog_changed_at(), snapshot_changed_at())
+
+
+def _taxonomy_etag(request):
+    return f"taxonomy-{taxonomy_version()}"
+
+
+def _taxonomy_last_modified(request):
+    return taxonomy_changed_at()
+
+
 def _parse_json_body(request):
     body = (request.body or b"").strip()
     if not body:
@@ -30,18 +119,37 @@ def _parse_json_body(request):
         return None, "Invalid JSON body"
 
 
-def _is_manager(user):
-    return user.is_authenticated and (
-        user.is_superuser or user.groups.filter(name="manager").exists()
-    )
-
-
 def _serialize_price(value):
     if isinstance(value, Decimal):
         return float(value)
     return value
 
 
+def _serialize_game_summary(game):
+    return {
+        "id": game.pk,
+        "title": game.title,
+        "slug": game.slug,
+        "price": _serialize_price(game.price),
+        "discount_percent": game.discount_percent,
+        "release_year": game.release_year,
+        "publisher": game.publisher.name if game.publisher else None,
+        "genres": [genre.name for genre in game.genres.all()],
+        "platforms": [platform.name for platform in game.platforms.all()],
+        "average_rating": float(game.average_rating or 0),
+        "reviews_count": int(game.reviews_count or 0),
+        "image": game.primary_image_urls,
+    }
+
+
+def _prefetch_game_images(games):
+    prefetch_image_urls(file for game in games for file in (game.primary_image, game.cover))
+
+
+def _split_param(value):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
 def _get_game_or_404_json(slug, queryset=None):
     target_qs = queryset if queryset is not None else Game.objects.all()
     try:
@@ -51,19 +159,10 @@ def _get_game_or_404_json(slug, queryset=None):
 
 
 def _annotated_games_queryset():
-    review_stats = (
-        Review.objects.filter(game=OuterRef("pk"))
-        .values("game")
-        .annotate(avg_rating=Avg("rating"), total_reviews=Count("id"))
-    )
     return (
         Game.objects.filter(is_active=True)
         .select_related("publisher")
         .prefetch_related("genres", "platforms")
-        .annotate(
-            average_rating=Subquery(review_stats.values("avg_rating")[:1]),
-            reviews_count=Subquery(review_stats.values("total_reviews")[:1]),
-        )
     )
 
 
@@ -73,9 +172,10 @@ def health(request):
 
 
 @require_http_methods(["GET", "POST"])
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
 def games_list(request):
     if request.method == "POST":
-        if not _is_manager(request.user):
+        if not is_manager(request.user):
             return _json_error("forbidden", status=403)
 
         payload, error = _parse_json_body(request)
@@ -101,33 +201,36 @@ def games_list(request):
     platform = request.GET.get("platform", "").strip()
     sort = request.GET.get("sort", "").strip()
 
-    games_qs = _annotated_games_queryset()
-
-    if q:
-        games_qs = games_qs.filter(title__icontains=q)
-    if genre:
-        games_qs = games_qs.filter(genres__slug=genre)
-    if platform:
-        games_qs = games_qs.filter(platforms__slug=platform)
-
-    if sort == "price_asc":
-        games_qs = games_qs.order_by("price", "-created_at")
-    elif sort == "price_desc":
-        games_qs = games_qs.order_by("-price", "-created_at")
-    else:
-        games_qs = games_qs.order_by("-created_at")
-
-    games_qs = games_qs.distinct()
-
-    page_raw = request.GET.get("page", "1")
-    try:
-        page_number = int(page_raw)
-    except ValueError:
-        page_number = 1
-
-    paginator = Paginator(games_qs, 10)
-    page_obj = paginator.get_page(page_number)
-
+    ordering = resolve_game_sort(sort, q)
+    cursor = request.GET.get("cursor")
+    page = request.GET.get("page")
+
+    page_obj = snapshot_page(
+        _annotated_games_queryset(),
+        ordering,
+        10,
+        cursor=cursor,
+        page=page,
+        q=q,
+        genre=genre,
+        platform=platform,
+    )
+    if page_obj is None:
+        games_qs = _annotated_games_queryset()
+        if q:
+            games_qs = search_games(games_qs, q)
+        if genre:
+            games_qs = games_qs.filter(genres__slug=genre)
+        if platform:
+            games_qs = games_qs.filter(platforms__slug=platform)
+        if ordering == RELEVANCE_GAME_SORT:
+            page_obj = search_page(games_qs.distinct(), q, 10, cursor=cursor, page=page)
+        else:
+            page_obj = keyset_paginate(
+                games_qs.distinct(), ordering, 10, cursor=cursor, page=page
+            )
+
+    _prefetch_game_images(page_obj.object_list)
     items = []
     for game in page_obj.object_list:
         items.append(
@@ -137,6 +240,7 @@ def games_list(request):
                 "price": _serialize_price(game.price),
                 "average_rating": float(game.average_rating or 0),
                 "reviews_count": int(game.reviews_count or 0),
+                "image": game.primary_image_urls,
             }
         )
 
@@ -145,14 +249,18 @@ def games_list(request):
             "items": items,
             "pagination": {
                 "page": page_obj.number,
-                "pages": paginator.num_pages,
-                "total": paginator.count,
+                "pages": page_obj.num_pages,
+                "total": page_obj.total,
+                "next": page_obj.next_cursor,
+                "prev": page_obj.previous_cursor,
             },
+            "facets": facet_counts(q=q, genre=genre, platform=platform),
         }
     )
 
 
 @require_http_methods(["GET", "PUT", "DELETE"])
+@condition(etag_func=_game_etag, last_modified_func=_game_last_modified)
 def game_detail(request, slug):
     game, error_response = _get_game_or_404_json(
         slug,
@@ -162,7 +270,7 @@ def game_detail(request, slug):
         return error_response
 
     if request.method == "PUT":
-        if not _is_manager(request.user):
+        if not is_manager(request.user):
             return _json_error("forbidden", status=403)
         payload, error = _parse_json_body(request)
         if error:
@@ -177,13 +285,12 @@ def game_detail(request, slug):
         return _json_ok({"title": game.title, "slug": game.slug})
 
     if request.method == "DELETE":
-        if not _is_manager(request.user):
+        if not is_manager(request.user):
             return _json_error("forbidden", status=403)
         game.delete()
         return _json_ok({"deleted": True})
 
     reviews_qs = Review.objects.filter(game=game).select_related("user").order_by("-created_at")
-    summary = reviews_qs.aggregate(avg_rating=Avg("rating"), reviews_count=Count("id"))
 
     data = {
         "title": game.title,
@@ -193,33 +300,118 @@ def game_detail(request, slug):
         "discount_percent": game.discount_percent,
         "release_year": game.release_year,
         "publisher": game.publisher.name if game.publisher else None,
-        "genres": list(game.genres.values_list("name", flat=True)),
-        "platforms": list(game.platforms.values_list("name", flat=True)),
-        "average_rating": float(summary["avg_rating"] or 0),
-        "reviews_count": int(summary["reviews_count"] or 0),
-        "recent_reviews": [
-            {
-                "username": review.user.username,
-                "rating": review.rating,
-                "text": review.text,
-                "created_at": review.created_at.isoformat(),
-            }
-            for review in reviews_qs[:5]
-        ],
+        "genres": [genre.name for genre in game.genres.all()],
+        "platforms": [platform.name for platform in game.platforms.all()],
+        "average_rating": float(game.average_rating or 0),
+        "reviews_count": int(game.reviews_count or 0),
+        "image": game.primary_image_urls,
+        "rating_histogram": {str(stars): count for stars, count in game.rating_histogram},
+        "recent_reviews": [serialize_review(review) for review in reviews_qs[:5]],
     }
     return _json_ok(data)
 
 
 @require_http_methods(["GET"])
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+def games_batch(request):
+    slugs = list(dict.fromkeys(_split_param(request.GET.get("slugs"))))
+    try:
+        ids = list(dict.fromkeys(int(value) for value in _split_param(request.GET.get("ids"))))
+    except ValueError:
+        return _json_error("ids must be integers", status=400)
+    if not slugs and not ids:
+        return _json_error("slugs or ids are required", status=400)
+    if len(slugs) + len(ids) > BATCH_MAX_GAMES:
+        return _json_error(f"at most {BATCH_MAX_GAMES} games per request", status=400)
+
+    games = list(
+        Game.objects.filter(Q(slug__in=slugs) | Q(pk__in=ids))
+        .select_related("publisher")
+        .prefetch_related("genres", "platforms")
+    )
+    _prefetch_game_images(games)
+    by_slug = {game.slug: game for game in games}
+    by_id = {game.pk: game for game in games}
+
+    # A game asked for by both slug and id is returned once, at its first position.
+    requested = [by_slug[slug] for slug in slugs if slug in by_slug]
+    requested += [by_id[pk] for pk in ids if pk in by_id]
+    items = [_serialize_game_summary(game) for game in dict.fromkeys(requested)]
+    return _json_ok(
+        {
+            "items": items,
+            "missing": {
+                "slugs": [slug for slug in slugs if slug not in by_slug],
+                "ids": [pk for pk in ids if pk not in by_id],
+            },
+        }
+    )
+
+
+@require_http_methods(["GET"])
+@condition(etag_func=_export_etag, last_modified_func=_catalog_last_modified)
+def games_export(request):
+    chunks = iter_ndjson()
+    use_gzip = _wants_gzip(request)
+    if use_gzip:
+        chunks = gzip_stream(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type="application/x-ndjson")
+    response["Content-Disposition"] = 'attachment; filename="catalog.ndjson"'
+    if use_gzip:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+@require_http_methods(["GET"])
+def game_reviews(request, slug):
+    game, error_response = _get_game_or_404_json(
+        slug, Game.objects.only("id", "slug", "reviews_count")
+    )
+    if error_response:
+        return error_response
+
+    sort = resolve_review_sort(request.GET.get("sort", "").strip())
+    page_obj = review_page(game, sort=sort, cursor=request.GET.get("cursor"))
+    own = own_review(game, request.user)
+    return _json_ok(
+        {
+            "items": [serialize_review(review) for review in page_obj.object_list],
+            "own": serialize_review(own) if own else None,
+            "sort": sort,
+            "pagination": {
+                "total": page_obj.total,
+                "next": page_obj.next_cursor,
+                "prev": page_obj.previous_cursor,
+            },
+        }
+    )
+
+
+@require_http_methods(["GET"])
+@never_cache
+def game_overlay(request, slug):
+    if not request.user.is_authenticated:
+        return _json_ok({"authenticated": False, "is_favorite": False, "user_review": None})
+
+    is_favorite = Favorite.objects.filter(user=request.user, game__slug=slug).exists()
+    user_review = (
+        Review.objects.filter(user=request.user, game__slug=slug).values("rating", "text").first()
+    )
+    return _json_ok({"authenticated": True, "is_favorite": is_favorite, "user_review": user_review})
+
+
+@require_http_methods(["GET"])
+@condition(etag_func=_taxonomy_etag, last_modified_func=_taxonomy_last_modified)
 def genres_list(request):
-    items = list(Genre.objects.order_by("name").values("name", "slug"))
-    return _json_ok(items)
+    return _cached_lookup_response(TAXONOMY_NAMESPACE, Genre)
 
 
 @require_http_methods(["GET"])
+@condition(etag_func=_taxonomy_etag, last_modified_func=_taxonomy_last_modified)
 def platforms_list(request):
-    items = list(Platform.objects.order_by("name").values("name", "slug"))
-    return _json_ok(items)
+    return _cached_lookup_response(TAXONOMY_NAMESPACE, Platform)
 
 
 @require_http_methods(["POST"])
@@ -230,17 +422,116 @@ def favorite_toggle(request, slug):
     game, error_response = _get_game_or_404_json(slug)
     if error_response:
         return error_response
-    favorite = Favorite.objects.filter(user=request.user, game=game).first()
-    if favorite:
-        favorite.delete()
-        is_favorite = False
-    else:
-        Favorite.objects.create(user=request.user, game=game)
-        is_favorite = True
-
+    is_favorite = toggle_favorite(request.user, game)
     return _json_ok({"is_favorite": is_favorite})
 
 
+def _parse_cart_operations(payload):
+    operations = payload.get("operations") if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return None, "operations must be a non-empty list"
+    if len(operations) > CART_MAX_OPERATIONS:
+        return None, f"at most {CART_MAX_OPERATIONS} operations per request"
+
+    parsed = []
+    for operation in operations:
+        if not isinstance(operation, dict):
+            return None, "each operation must be an object"
+        op = operation.get("op")
+        slug = operation.get("slug")
+        if op not in CART_OPERATIONS:
+            return None, f"op must be one of {', '.join(CART_OPERATIONS)}"
+        if not isinstance(slug, str) or not slug.strip():
+            return None, "slug is required"
+        quantity = operation.get("quantity", 1 if op == "add" else None)
+        if op != "remove":
+            minimum = 1 if op == "add" else 0
+            if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < minimum:
+                return None, f"quantity must be integer >= {minimum} for {op}"
+        parsed.append((op, slug.strip(), quantity or 0))
+    return parsed, None
+
+
+def _serialize_cart(state):
+    return {
+        "items": [
+            {
+                "slug": item.game.slug,
+                "title": item.game.title,
+                "quantity": item.quantity,
+                "price": _serialize_price(item.price_snapshot),
+                "subtotal": _serialize_price(item.price_snapshot * item.quantity),
+            }
+            for item in state["items"]
+        ],
+        "item_count": state["item_count"],
+        "total": _serialize_price(state["total"]),
+    }
+
+
+@never_cache
+@require_http_methods(["GET", "POST"])
+def cart(request):
+    if not request.user.is_authenticated:
+        return _json_error("auth_required", status=401)
+
+    skipped = []
+    if request.method == "POST":
+        payload, error = _parse_json_body(request)
+        if error:
+            return _json_error(error, status=400)
+        operations, error = _parse_cart_operations(payload)
+        if error:
+            return _json_error(error, status=400)
+        skipped = apply_cart_operations(request.user, operations)
+
+    data = _serialize_cart(cart_state(request.user))
+    data["skipped"] = skipped
+    return _json_ok(data)
+
+
+@never_cache
+@require_http_methods(["GET"])
+def orders_list(request):
+    if not request.user.is_authenticated:
+        return _json_error("auth_required", status=401)
+
+    page_obj = order_history_page(
+        request.user, cursor=request.GET.get("cursor"), page=request.GET.get("page")
+    )
+    items = [
+        {
+            "id": order.pk,
+            "status": order.status,
+            "total_price": _serialize_price(order.total_price),
+            "created_at": order.created_at.isoformat(),
+            "item_count": order.item_count,
+            "items": [
+                {
+                    "slug": item.game.slug,
+                    "title": item.game.title,
+                    "quantity": item.quantity,
+                    "price": _serialize_price(item.price_snapshot),
+                }
+                for item in order.items.all()
+            ],
+        }
+        for order in page_obj.object_list
+    ]
+    return _json_ok(
+        {
+            "items": items,
+            "pagination": {
+                "page": page_obj.number,
+                "pages": page_obj.num_pages,
+                "total": page_obj.total,
+                "next": page_obj.next_cursor,
+                "prev": page_obj.previous_cursor,
+            },
+        }
+    )
+
+
 @require_http_methods(["POST"])
 def review_upsert(request, slug):
     if not request.user.is_authenticated:
@@ -264,24 +555,11 @@ def review_upsert(request, slug):
 
     text = str(payload.get("text", "")).strip()
 
-    review, created = Review.objects.get_or_create(
-        user=request.user,
-        game=game,
-        defaults={"rating": rating, "text": text},
-    )
-    if not created:
-        review.rating = rating
-        review.text = text
-        review.save(update_fields=["rating", "text"])
-
-    summary = Review.objects.filter(game=game).aggregate(
-        avg_rating=Avg("rating"),
-        reviews_count=Count("id"),
-    )
+    result = upsert_review(request.user, game, rating, text)
     return _json_ok(
         {
-            "avg_rating": float(summary["avg_rating"] or 0),
-            "reviews_count": int(summary["reviews_count"] or 0),
+            "avg_rating": result["average_rating"],
+            "reviews_count": result["reviews_count"],
         }
     )
 
@@ -0,0 +1,139 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+
+from catalog.models import Game
+
+from .models import Cart, CartItem
+from .stats import apply_cart_change
+
+ANONYMOUS_CART_COOKIE = "cart"
+ANONYMOUS_CART_SALT = "cart.anonymous"
+ANONYMOUS_CART_MAX_AGE = 60 * 60 * 24 * 30
+ANONYMOUS_CART_MAX_ITEMS = 50
+ANONYMOUS_CART_MAX_QUANTITY = 99
+
+
+def _clean(data):
+    cart = {}
+    if not isinstance(data, dict):
+        return cart
+    for slug, quantity in data.items():
+        if len(cart) >= ANONYMOUS_CART_MAX_ITEMS:
+            break
+        if isinstance(slug, str) and isinstance(quantity, int) and quantity > 0:
+            cart[slug] = min(quantity, ANONYMOUS_CART_MAX_QUANTITY)
+    return cart
+
+
+def get_anonymous_cart(request):
+    if not hasattr(request, "_anonymous_cart"):
+        raw = request.COOKIES.get(ANONYMOUS_CART_COOKIE)
+        value = request.get_signed_cookie(
+            ANONYMOUS_CART_COOKIE,
+            default=None,
+            salt=ANONYMOUS_CART_SALT,
+            max_age=ANONYMOUS_CART_MAX_AGE,
+        )
+        try:
+            data = json.loads(value) if value else None
+        except ValueError:
+            data = None
+        request._anonymous_cart = _clean(data)
+        # A cookie that failed to load is rewritten (dropped) on the way out.
+        request._anonymous_cart_changed = bool(raw) and not request._anonymous_cart
+    return request._anonymous_cart
+
+
+def set_anonymous_quantity(request, slug, quantity):
+    cart = get_anonymous_cart(request)
+    if quantity > 0:
+        if slug not in cart and len(cart) >= ANONYMOUS_CART_MAX_ITEMS:
+            return
+        cart[slug] = min(quantity, ANONYMOUS_CART_MAX_QUANTITY)
+    elif cart.pop(slug, None) is None:
+        return
+    request._anonymous_cart_changed = True
+
+
+def clear_anonymous_cart(request):
+    get_anonymous_cart(request).clear()
+    request._anonymous_cart_changed = True
+
+
+def save_anonymous_cart(request, response):
+    if not getattr(request, "_anonymous_cart_changed", False):
+        return response
+    cart = request._anonymous_cart
+    if cart:
+        response.set_signed_cookie(
+            ANONYMOUS_CART_COOKIE,
+            json.dumps(cart, separators=(",", ":")),
+            salt=ANONYMOUS_CART_SALT,
+            max_age=ANONYMOUS_CART_MAX_AGE,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+    else:
+        response.delete_cookie(ANONYMOUS_CART_COOKIE, samesite="Lax")
+    return response
+
+
+def anonymous_cart_items(request):
+    cart = get_anonymous_cart(request)
+    if not cart:
+        return []
+    games = Game.objects.filter(slug__in=cart, is_active=True).only("id", "slug", "title", "price")
+    games = {game.slug: game for game in games}
+    # Unsaved CartItem rows so templates render both carts the same way.
+    return [
+        CartItem(game=games[slug], quantity=quantity, price_snapshot=games[slug].price)
+        for slug, quantity in cart.items()
+        if slug in games
+    ]
+
+
+def merge_anonymous_cart(request, user):
+    cart = get_anonymous_cart(request)
+    if not cart:
+        return
+    with transaction.atomic():
+        user_cart, _ = Cart.objects.select_for_update().get_or_create(user=user)
+        games = list(Game.objects.filter(slug__in=cart, is_active=True).only("id", "slug", "price"))
+        existing = CartItem.objects.filter(cart=user_cart, game__in=games)
+        existing = {
+            game_id: (quantity, price)
+            for game_id, quantity, price in existing.values_list(
+                "game_id", "quantity", "price_snapshot"
+            )
+        }
+        items = []
+        total_delta = 0
+        for game in games:
+            quantity, price = existing.get(game.pk, (0, game.price))
+            items.append(
+                CartItem(
+                    cart=user_cart,
+                    game=game,
+                    quantity=quantity + cart[game.slug],
+                    price_snapshot=price,
+                )
+            )
+            total_delta += price * cart[game.slug]
+        if items:
+            # Existing rows keep their price snapshot and only take the summed quantity.
+            CartItem.objects.bulk_create(
+                items,
+                update_conflicts=True,
+                unique_fields=["cart", "game"],
+                update_fields=["quantity"],
+            )
+            apply_cart_change(
+                user.pk,
+                sum(cart[game.slug] for game in games),
+                total_delta,
+                sum(game.pk not in existing for game in games),
+            )
+    clear_anonymous_cart(request)
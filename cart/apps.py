@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CartConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "cart"
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+
+        from . import signals
+
+        user_logged_in.connect(
+            signals.merge_cart_on_login,
+            dispatch_uid="cart.anonymous.merge_on_login",
+        )
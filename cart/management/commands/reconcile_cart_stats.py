@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cart.stats import rebuild_cart_stats
+from favorites.stats import rebuild_favorites_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored cart totals and profile favorite counts from their rows."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        carts = rebuild_cart_stats()
+        profiles = rebuild_favorites_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {carts} carts and {profiles} profile favorite counts.")
+        )
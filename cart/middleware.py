@@ -0,0 +1,10 @@
+from .anonymous import save_anonymous_cart
+
+
+class AnonymousCartMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return save_anonymous_cart(request, response)
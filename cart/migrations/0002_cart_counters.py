@@ -0,0 +1,52 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_cart_counters(apps, schema_editor):
+    Cart = apps.get_model("cart", "Cart")
+    CartItem = apps.get_model("cart", "CartItem")
+
+    items = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    money = DecimalField(max_digits=12, decimal_places=2)
+    Cart.objects.update(
+        item_count=Coalesce(
+            Subquery(items.annotate(total=Sum("quantity")).values("total")[:1]),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+        total=Coalesce(
+            Subquery(
+                items.annotate(
+                    total=Sum(F("quantity") * F("price_snapshot"), output_field=money)
+                ).values("total")[:1]
+            ),
+            Value(Decimal("0")),
+            output_field=money,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cart", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cart",
+            name="total",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(populate_cart_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_line_count(apps, schema_editor):
+    Cart = apps.get_model("cart", "Cart")
+    CartItem = apps.get_model("cart", "CartItem")
+
+    items = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    Cart.objects.update(
+        line_count=Coalesce(
+            Subquery(items.annotate(total=Count("pk")).values("total")[:1]),
+            Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cart", "0002_cart_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="line_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_line_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,6 @@
+from .anonymous import merge_anonymous_cart
+
+
+def merge_cart_on_login(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, "COOKIES"):
+        merge_anonymous_cart(request, user)
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from accounts.chrome import bump_chrome_version
+
+from .models import Cart, CartItem
+
+MONEY_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def apply_cart_change(user_id, quantity_delta, total_delta, line_delta=0):
+    if not quantity_delta and not total_delta and not line_delta:
+        return
+    Cart.objects.filter(user_id=user_id).update(
+        line_count=F("line_count") + line_delta,
+        item_count=F("item_count") + quantity_delta,
+        total=F("total") + total_delta,
+    )
+    bump_chrome_version(user_id)
+
+
+def reset_cart_stats(user_id):
+    Cart.objects.filter(user_id=user_id).update(line_count=0, item_count=0, total=Decimal("0"))
+    bump_chrome_version(user_id)
+
+
+def rebuild_cart_stats(queryset=None):
+    carts_qs = queryset if queryset is not None else Cart.objects.all()
+    items = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    line_count = Coalesce(
+        Subquery(items.annotate(total=Count("pk")).values("total")[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    item_count = Coalesce(
+        Subquery(items.annotate(total=Sum("quantity")).values("total")[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    line_totals = Sum(F("quantity") * F("price_snapshot"), output_field=MONEY_FIELD)
+    total = Coalesce(
+        Subquery(items.annotate(total=line_totals).values("total")[:1]),
+        Value(Decimal("0")),
+        output_field=MONEY_FIELD,
+    )
+    return carts_qs.update(line_count=line_count, item_count=item_count, total=total)
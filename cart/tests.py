@@ -0,0 +1,140 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cart.models import Cart, CartItem
+from cart.stats import rebuild_cart_stats
+from cart.writes import add_to_cart, apply_cart_operations
+from catalog.models import Game
+from core.testing import ConcurrencyMixin
+
+
+def create_games(count, price=Decimal("2.00")):
+    return [
+        Game.objects.create(
+            title=f"Game {index}", description="x", price=price, release_year=2020
+        )
+        for index in range(count)
+    ]
+
+
+def cart_lines(user):
+    return dict(CartItem.objects.filter(cart__user=user).values_list("game__slug", "quantity"))
+
+
+def cart_counters(user):
+    counters = Cart.objects.filter(user=user).values_list("line_count", "item_count", "total")
+    return tuple(counters.get())
+
+
+class CartOperationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="buyer")
+
+    def test_operations_fold_per_game_and_keep_counters_exact(self):
+        first, second, third = create_games(3)
+        skipped = apply_cart_operations(
+            self.user,
+            [
+                ("add", first.slug, 1),
+                ("add", first.slug, 2),
+                ("set", second.slug, 4),
+                ("add", second.slug, 1),
+                ("add", "missing", 1),
+            ],
+        )
+        self.assertEqual(skipped, ["missing"])
+        self.assertEqual(cart_lines(self.user), {first.slug: 3, second.slug: 5})
+        self.assertEqual(cart_counters(self.user), (2, 8, Decimal("16.00")))
+
+        apply_cart_operations(
+            self.user,
+            [("remove", first.slug, 0), ("add", third.slug, 2), ("set", second.slug, 1)],
+        )
+        self.assertEqual(cart_lines(self.user), {second.slug: 1, third.slug: 2})
+        self.assertEqual(cart_counters(self.user), (2, 3, Decimal("6.00")))
+        Cart.objects.filter(user=self.user).update(line_count=0, item_count=0)
+        rebuild_cart_stats()
+        self.assertEqual(cart_counters(self.user), (2, 3, Decimal("6.00")))
+
+    def test_existing_lines_keep_their_price_snapshot(self):
+        (game,) = create_games(1)
+        add_to_cart(self.user, game)
+        Game.objects.filter(pk=game.pk).update(price=Decimal("50.00"))
+        apply_cart_operations(self.user, [("add", game.slug, 1)])
+        item = CartItem.objects.get(cart__user=self.user)
+        self.assertEqual((item.quantity, item.price_snapshot), (2, Decimal("2.00")))
+        self.assertEqual(cart_counters(self.user), (1, 2, Decimal("4.00")))
+
+    def test_statement_count_does_not_grow_with_the_batch(self):
+        games = create_games(12)
+        add_to_cart(self.user, games[0])
+        add_to_cart(self.user, games[1])
+        batches = (
+            [("add", games[2].slug, 1), ("set", games[3].slug, 2), ("remove", games[0].slug, 0)],
+            [("add", game.slug, 1) for game in games[4:8]]
+            + [("set", game.slug, 3) for game in games[8:]]
+            + [("remove", games[2].slug, 0), ("remove", games[3].slug, 0)],
+        )
+        counts = []
+        for operations in batches:
+            with CaptureQueriesContext(connection) as queries:
+                apply_cart_operations(self.user, operations)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class CartUpdateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("buyer", password="secret")
+        self.game = Game.objects.create(
+            title="Game", description="x", price=Decimal("10.00"), release_year=2020
+        )
+        self.url = reverse("pages:cart_update", args=[self.game.slug])
+
+    def test_update_never_adds_a_missing_game(self):
+        self.client.post(self.url, {"quantity": "3"})
+        self.assertNotIn("cart", self.client.cookies)
+
+        self.client.force_login(self.user)
+        self.client.post(self.url, {"quantity": "3"})
+        self.assertFalse(CartItem.objects.filter(cart__user=self.user).exists())
+
+    def test_update_changes_an_existing_line(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("pages:cart_add", args=[self.game.slug]))
+        self.client.post(self.url, {"quantity": "3"})
+        self.assertEqual(CartItem.objects.get(cart__user=self.user).quantity, 3)
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual((cart.item_count, cart.total), (3, Decimal("30.00")))
+
+    def test_header_and_profile_count_line_items(self):
+        self.client.post(reverse("pages:cart_add", args=[self.game.slug]))
+        self.client.post(self.url, {"quantity": "3"})
+        response = self.client.get(reverse("pages:cart_detail"))
+        self.assertContains(response, '<span class="cart-count">1</span>')
+
+        self.client.force_login(self.user)
+        self.client.post(reverse("pages:cart_add", args=[self.game.slug]))
+        self.client.post(self.url, {"quantity": "3"})
+        response = self.client.get(reverse("pages:cart_detail"))
+        self.assertContains(response, '<span class="cart-count">1</span>')
+        self.assertEqual(self.client.get(reverse("pages:profile")).context["cart_count"], 1)
+
+
+class ConcurrentCartTests(ConcurrencyMixin, TransactionTestCase):
+    def test_parallel_adds_are_all_counted(self):
+        user = User.objects.create(username="buyer")
+        (game,) = create_games(1)
+
+        def add_three_times(_):
+            for _ in range(3):
+                add_to_cart(User.objects.get(pk=user.pk), game)
+
+        self.run_in_parallel(add_three_times, range(self.workers))
+        self.assertEqual(cart_lines(user), {game.slug: 3 * self.workers})
+        self.assertEqual(cart_counters(user), (1, 3 * self.workers, Decimal("36.00")))
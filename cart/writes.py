@@ -0,0 +1,135 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+from catalog.models import Game
+
+from .models import Cart, CartItem
+from .stats import apply_cart_change
+
+CART_OPERATIONS = ("add", "set", "remove")
+
+
+def _increment_sql(rows):
+    meta = CartItem._meta
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    fields = ("cart", "game", "quantity", "price_snapshot")
+    columns = ", ".join(quote(meta.get_field(name).column) for name in fields)
+    conflict = ", ".join(quote(meta.get_field(name).column) for name in ("cart", "game"))
+    quantity = quote(meta.get_field("quantity").column)
+    values = ", ".join(["(%s, %s, %s, %s)"] * rows)
+    return (
+        f"INSERT INTO {table} AS item ({columns}) VALUES {values} "
+        f"ON CONFLICT ({conflict}) DO UPDATE "
+        f"SET {quantity} = item.{quantity} + EXCLUDED.{quantity}"
+    )
+
+
+def _plan(operations):
+    # Folds the operations per game: (True, n) sets the quantity to n, (False, n) adds n.
+    plan = {}
+    for operation, slug, quantity in operations:
+        if operation == "add":
+            absolute, current = plan.get(slug, (False, 0))
+            plan[slug] = (absolute, current + quantity)
+        elif operation == "set":
+            plan[slug] = (True, quantity)
+        else:
+            plan[slug] = (True, 0)
+    return plan
+
+
+def apply_cart_operations(user, operations, create_missing=True):
+    plan = _plan(operations)
+    skipped = []
+    if not plan:
+        return skipped
+
+    with transaction.atomic():
+        # The cart lock serializes writers for this user, so the counter deltas below stay exact.
+        cart, _ = Cart.objects.select_for_update().get_or_create(user=user)
+        games = Game.objects.filter(slug__in=plan).only("id", "slug", "price", "is_active")
+        games = {game.slug: game for game in games}
+        existing = CartItem.objects.filter(cart=cart, game__slug__in=plan)
+        existing = {
+            game_id: (quantity, price)
+            for game_id, quantity, price in existing.values_list(
+                "game_id", "quantity", "price_snapshot"
+            )
+        }
+
+        price_field = CartItem._meta.get_field("price_snapshot")
+        increments = []
+        updates = []
+        removals = []
+        line_delta = quantity_delta = 0
+        total_delta = Decimal("0")
+        for slug, (absolute, quantity) in plan.items():
+            game = games.get(slug)
+            if game is None:
+                skipped.append(slug)
+                continue
+            current = existing.get(game.pk)
+            if current is None and (quantity <= 0 or absolute and not create_missing):
+                continue
+            if current is None and not game.is_active:
+                skipped.append(slug)
+                continue
+            old_quantity, price = current or (0, game.price)
+            if not absolute:
+                increments.extend(
+                    [cart.pk, game.pk, quantity, price_field.get_db_prep_save(price, connection)]
+                )
+                delta = quantity
+            elif quantity > 0:
+                updates.append(
+                    CartItem(cart=cart, game=game, quantity=quantity, price_snapshot=price)
+                )
+                delta = quantity - old_quantity
+            else:
+                removals.append(game.pk)
+                delta = -old_quantity
+                line_delta -= 1
+            if current is None:
+                line_delta += 1
+            quantity_delta += delta
+            total_delta += price * delta
+
+        if increments:
+            with connection.cursor() as cursor:
+                cursor.execute(_increment_sql(len(increments) // 4), increments)
+        if updates:
+            CartItem.objects.bulk_create(
+                updates,
+                update_conflicts=True,
+                unique_fields=["cart", "game"],
+                update_fields=["quantity"],
+            )
+        if removals:
+            CartItem.objects.filter(cart=cart, game_id__in=removals).delete()
+        apply_cart_change(user.pk, quantity_delta, total_delta, line_delta)
+    return skipped
+
+
+def cart_state(user):
+    cart = Cart.objects.filter(user=user).values("item_count", "total").first() or {}
+    items = list(CartItem.objects.filter(cart__user=user).select_related("game").order_by("pk"))
+    return {
+        "items": items,
+        "item_count": cart.get("item_count", 0),
+        "total": cart.get("total", Decimal("0")),
+    }
+
+
+def add_to_cart(user, game, quantity=1):
+    return apply_cart_operations(user, [("add", game.slug, quantity)])
+
+
+def set_cart_quantity(user, slug, quantity):
+    # Updates an existing line only, like the anonymous cart; adding goes through add_to_cart.
+    return apply_cart_operations(user, [("set", slug, quantity)], create_missing=False)
+
+
+def remove_from_cart(user, slug):
+    return apply_cart_operations(user, [("remove", slug, 0)])
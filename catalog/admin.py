@@ -1,7 +1,12 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.utils.html import format_html
 
+from core.utils.media import image_url, prefetch_image_urls
+
+from .cache import bump_catalog_version
 from .models import Developer, Game, Publisher, Screenshot, SystemRequirement
+from .snapshot import invalidate_snapshot
 
 
 class ScreenshotInline(admin.TabularInline):
@@ -16,11 +21,21 @@ class ScreenshotInline(admin.TabularInline):
         if obj.pk and obj.image:
             return format_html(
                 '<img src="{}" style="width: 120px; height: 68px; object-fit: cover; border-radius: 8px;" />',
-                obj.image.url,
+                image_url(obj.image, "thumbnail"),
             )
         return "-"
 
 
+class GameChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        # One asset query for the page instead of one per row on a cold media cache.
+        self.result_list = list(self.result_list)
+        prefetch_image_urls(
+            file for game in self.result_list for file in (game.primary_image, game.cover)
+        )
+
+
 @admin.register(Publisher)
 class PublisherAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "slug")
@@ -75,13 +90,20 @@ class GameAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_changelist(self, request, **kwargs):
+        return GameChangeList
+
     @admin.action(description="Mark selected games as active")
     def mark_as_active(self, request, queryset):
         queryset.update(is_active=True)
+        bump_catalog_version()
+        invalidate_snapshot()
 
     @admin.action(description="Mark selected games as inactive")
     def mark_as_inactive(self, request, queryset):
         queryset.update(is_active=False)
+        bump_catalog_version()
+        invalidate_snapshot()
 
     @admin.display(description="Thumbnail")
     def primary_image_preview(self, obj):
@@ -4,3 +4,157 @@ from django.apps import AppConfig
 class CatalogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "catalog"
+
+    def ready(self):
+        from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+        from core.utils.images import image_processed
+        from taxonomy.models import Genre, Platform, Tag
+
+        from . import signals
+        from .models import Developer, Game, Publisher, Screenshot, SystemRequirement
+
+        catalog_models = (
+            Game,
+            Publisher,
+            Developer,
+            Screenshot,
+            SystemRequirement,
+            Genre,
+            Platform,
+            Tag,
+        )
+        for model in catalog_models:
+            label = model._meta.label_lower
+            post_save.connect(
+                signals.catalog_changed,
+                sender=model,
+                dispatch_uid=f"catalog.version.{label}_saved",
+            )
+            post_delete.connect(
+                signals.catalog_changed,
+                sender=model,
+                dispatch_uid=f"catalog.version.{label}_deleted",
+            )
+        for through in (Game.genres.through, Game.platforms.through, Game.tags.through):
+            m2m_changed.connect(
+                signals.catalog_changed,
+                sender=through,
+                dispatch_uid=f"catalog.version.{through._meta.label_lower}_changed",
+            )
+
+        post_save.connect(
+            signals.publishers_changed,
+            sender=Publisher,
+            dispatch_uid="catalog.publishers.publisher_saved",
+        )
+        post_delete.connect(
+            signals.publishers_changed,
+            sender=Publisher,
+            dispatch_uid="catalog.publishers.publisher_deleted",
+        )
+
+        post_save.connect(
+            signals.refresh_primary_image,
+            sender=Screenshot,
+            dispatch_uid="catalog.primary_image.screenshot_saved",
+        )
+        post_delete.connect(
+            signals.refresh_primary_image,
+            sender=Screenshot,
+            dispatch_uid="catalog.primary_image.screenshot_deleted",
+        )
+        for model in (Screenshot, Publisher):
+            label = model._meta.label_lower
+            post_save.connect(
+                signals.game_cards_changed,
+                sender=model,
+                dispatch_uid=f"catalog.cards.{label}_saved",
+            )
+            post_delete.connect(
+                signals.game_cards_changed,
+                sender=model,
+                dispatch_uid=f"catalog.cards.{label}_deleted",
+            )
+
+        for model in (Game, Screenshot, SystemRequirement):
+            label = model._meta.label_lower
+            post_save.connect(
+                signals.product_page_changed,
+                sender=model,
+                dispatch_uid=f"catalog.product.{label}_saved",
+            )
+            post_delete.connect(
+                signals.product_page_changed,
+                sender=model,
+                dispatch_uid=f"catalog.product.{label}_deleted",
+            )
+        for through in (Game.platforms.through, Game.tags.through):
+            m2m_changed.connect(
+                signals.product_page_changed,
+                sender=through,
+                dispatch_uid=f"catalog.product.{through._meta.label_lower}_changed",
+            )
+
+        # Processed uploads swap originals for variants in cached cards, pages and API payloads.
+        for model in (Game, Screenshot):
+            label = model._meta.label_lower
+            for receiver, name in (
+                (signals.catalog_changed, "version"),
+                (signals.game_cards_changed, "cards"),
+                (signals.product_page_changed, "product"),
+            ):
+                image_processed.connect(
+                    receiver,
+                    sender=model,
+                    dispatch_uid=f"catalog.{name}.{label}_image_processed",
+                )
+
+        post_save.connect(
+            signals.reindex_game, sender=Game, dispatch_uid="catalog.search.game_saved"
+        )
+        post_delete.connect(
+            signals.unindex_game, sender=Game, dispatch_uid="catalog.search.game_deleted"
+        )
+        m2m_changed.connect(
+            signals.reindex_game_tags,
+            sender=Game.tags.through,
+            dispatch_uid="catalog.search.game_tags_changed",
+        )
+        for model in (Publisher, Developer, Tag):
+            label = model._meta.label_lower
+            post_save.connect(
+                signals.reindex_related_games,
+                sender=model,
+                dispatch_uid=f"catalog.search.{label}_saved",
+            )
+            pre_delete.connect(
+                signals.remember_related_games,
+                sender=model,
+                dispatch_uid=f"catalog.search.{label}_deleting",
+            )
+            post_delete.connect(
+                signals.reindex_remembered_games,
+                sender=model,
+                dispatch_uid=f"catalog.search.{label}_deleted",
+            )
+
+        # Connected after the version receivers, so snapshot changes are published last.
+        for model in (Game, Publisher, Genre, Platform, Tag):
+            label = model._meta.label_lower
+            post_save.connect(
+                signals.patch_snapshot,
+                sender=model,
+                dispatch_uid=f"catalog.snapshot.{label}_saved",
+            )
+            post_delete.connect(
+                signals.patch_snapshot,
+                sender=model,
+                dispatch_uid=f"catalog.snapshot.{label}_deleted",
+            )
+        for through in (Game.genres.through, Game.platforms.through, Game.tags.through):
+            m2m_changed.connect(
+                signals.patch_snapshot,
+                sender=through,
+                dispatch_uid=f"catalog.snapshot.{through._meta.label_lower}_changed",
+            )
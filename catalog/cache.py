@@ -0,0 +1,48 @@
+from core.utils.cache import bump_version_on_commit, cached_lookup, get_changed_at, get_version
+
+from .models import Publisher
+
+CATALOG_NAMESPACE = "catalog"
+PUBLISHER_NAMESPACE = "publishers"
+CARD_NAMESPACE = "cards"
+SNAPSHOT_NAMESPACE = "catalog-snapshot"
+
+
+def catalog_version():
+    return get_version(CATALOG_NAMESPACE)
+
+
+def catalog_changed_at():
+    return get_changed_at(CATALOG_NAMESPACE)
+
+
+def snapshot_version():
+    return get_version(SNAPSHOT_NAMESPACE)
+
+
+def snapshot_changed_at():
+    return get_changed_at(SNAPSHOT_NAMESPACE)
+
+
+def bump_catalog_version():
+    bump_version_on_commit(CATALOG_NAMESPACE)
+
+
+def bump_publisher_version():
+    bump_version_on_commit(PUBLISHER_NAMESPACE)
+
+
+def bump_card_version():
+    bump_version_on_commit(CARD_NAMESPACE)
+
+
+def product_namespace(game_id):
+    return f"product:{game_id}"
+
+
+def bump_product_version(game_id):
+    bump_version_on_commit(product_namespace(game_id))
+
+
+def publisher_options():
+    return cached_lookup(PUBLISHER_NAMESPACE, Publisher)
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.utils.cache import versioned_key
+from core.utils.media import prefetch_image_urls
+
+from .cache import CARD_NAMESPACE
+
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _card_key(prefix, game):
+    # Rating totals change with every review, so they double as the game's rating version.
+    return (
+        f"{prefix}:{game.pk}:{game.updated_at.timestamp()}"
+        f":{game.rating_sum}:{game.reviews_count}"
+    )
+
+
+def attach_game_cards(games, template_name):
+    games = list(games)
+    if not games:
+        return games
+
+    prefix = versioned_key(CARD_NAMESPACE, template_name)
+    keys = {game.pk: _card_key(prefix, game) for game in games}
+    cached = cache.get_many(keys.values())
+
+    missing = [game for game in games if keys[game.pk] not in cached]
+    if missing:
+        prefetch_image_urls(file for game in missing for file in (game.primary_image, game.cover))
+        rendered = {
+            keys[game.pk]: render_to_string(template_name, {"game": game}) for game in missing
+        }
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+        cached.update(rendered)
+
+    for game in games:
+        game.card_html = mark_safe(cached[keys[game.pk]])
+    return games
@@ -0,0 +1,60 @@
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Game
+
+EXPORT_CHUNK_SIZE = 500
+
+
+def export_queryset():
+    return (
+        Game.objects.filter(is_active=True)
+        .select_related("publisher", "developer")
+        .prefetch_related("genres", "platforms", "tags")
+        .order_by("id")
+    )
+
+
+def serialize_export_game(game):
+    return {
+        "id": game.pk,
+        "slug": game.slug,
+        "title": game.title,
+        "description": game.description,
+        "detailed_description": game.detailed_description,
+        "price": game.price,
+        "discount_percent": game.discount_percent,
+        "release_year": game.release_year,
+        "publisher": game.publisher.name if game.publisher else None,
+        "developer": game.developer.name if game.developer else None,
+        "genres": [genre.slug for genre in game.genres.all()],
+        "platforms": [platform.slug for platform in game.platforms.all()],
+        "tags": [tag.slug for tag in game.tags.all()],
+        "average_rating": game.average_rating,
+        "reviews_count": game.reviews_count,
+        "created_at": game.created_at,
+        "updated_at": game.updated_at,
+    }
+
+
+def iter_ndjson(chunk_size=EXPORT_CHUNK_SIZE):
+    # iterator() runs the prefetches once per chunk, so memory is bounded by chunk_size.
+    lines = []
+    for game in export_queryset().iterator(chunk_size=chunk_size):
+        lines.append(json.dumps(serialize_export_game(game), cls=DjangoJSONEncoder))
+        if len(lines) >= chunk_size:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
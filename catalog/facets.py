@@ -0,0 +1,13 @@
+from .models import Game
+from .search import search_games
+from .snapshot import snapshot_facet_counts
+
+
+def facet_counts(q="", genre="", platform="", publisher="", tag="", rating=None):
+    query_ids = None
+    if q:
+        query_ids = list(
+            search_games(Game.objects.filter(is_active=True), q).values_list("id", flat=True)
+        )
+    selected = {"genre": genre, "platform": platform, "publisher": publisher, "tag": tag}
+    return snapshot_facet_counts(selected, rating=rating, query_ids=query_ids)
@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from catalog.export import EXPORT_CHUNK_SIZE, gzip_stream, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = "Export active catalog games as NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="File to write to (default: stdout).")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunks = iter_ndjson(chunk_size=options["chunk_size"])
+        if options["gzip"]:
+            chunks = gzip_stream(chunks)
+
+        output = options["output"]
+        stream = open(output, "wb") if output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+        finally:
+            if output:
+                stream.close()
+            else:
+                stream.flush()
+
+        if output:
+            self.stderr.write(self.style.SUCCESS(f"Exported catalog to {output}."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from catalog.search import rebuild_search_index, search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for catalog games."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        backend = search_backend()
+        if backend is None:
+            raise CommandError("Full-text search index is not available for this database.")
+
+        indexed = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} games ({backend})."))
@@ -0,0 +1,85 @@
+from django.db import migrations
+
+SQLITE_CREATE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS catalog_game_fts USING fts5(
+        title, publisher, developer, tags, description,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+SQLITE_POPULATE = """
+    INSERT INTO catalog_game_fts (rowid, title, publisher, developer, tags, description)
+    SELECT
+        g.id,
+        g.title,
+        COALESCE(p.name, ''),
+        COALESCE(d.name, ''),
+        COALESCE((
+            SELECT group_concat(t.name, ' ')
+            FROM catalog_game_tags gt
+            JOIN taxonomy_tag t ON t.id = gt.tag_id
+            WHERE gt.game_id = g.id
+        ), ''),
+        g.description || ' ' || g.detailed_description
+    FROM catalog_game g
+    LEFT JOIN catalog_publisher p ON p.id = g.publisher_id
+    LEFT JOIN catalog_developer d ON d.id = g.developer_id
+"""
+
+POSTGRES_CREATE = """
+    CREATE TABLE IF NOT EXISTS catalog_game_search (
+        game_id bigint PRIMARY KEY REFERENCES catalog_game (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS catalog_game_search_document_gin
+        ON catalog_game_search USING gin (document);
+"""
+
+POSTGRES_POPULATE = """
+    INSERT INTO catalog_game_search (game_id, document)
+    SELECT
+        g.id,
+        setweight(to_tsvector('simple', g.title), 'A')
+        || setweight(to_tsvector('simple', COALESCE(p.name, '') || ' ' || COALESCE(d.name, '')), 'B')
+        || setweight(to_tsvector('simple', COALESCE((
+            SELECT string_agg(t.name, ' ')
+            FROM catalog_game_tags gt
+            JOIN taxonomy_tag t ON t.id = gt.tag_id
+            WHERE gt.game_id = g.id
+        ), '')), 'B')
+        || setweight(to_tsvector('simple', g.description || ' ' || g.detailed_description), 'C')
+    FROM catalog_game g
+    LEFT JOIN catalog_publisher p ON p.id = g.publisher_id
+    LEFT JOIN catalog_developer d ON d.id = g.developer_id
+    ON CONFLICT (game_id) DO NOTHING
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_POPULATE)
+    elif vendor == "postgresql":
+        schema_editor.execute(POSTGRES_CREATE)
+        schema_editor.execute(POSTGRES_POPULATE)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS catalog_game_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS catalog_game_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0008_developer_fk_migration"),
+        ("taxonomy", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
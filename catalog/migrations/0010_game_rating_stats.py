@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_game_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="average_rating",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="reviews_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
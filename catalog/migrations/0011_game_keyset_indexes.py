@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_game_rating_stats"),
+        ("taxonomy", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["price", "id"], name="game_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["created_at", "id"], name="game_created_id_idx"),
+        ),
+    ]
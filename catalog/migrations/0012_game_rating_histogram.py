@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_game_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_primary_image(apps, schema_editor):
+    Game = apps.get_model("catalog", "Game")
+    Screenshot = apps.get_model("catalog", "Screenshot")
+
+    first = Screenshot.objects.filter(game=OuterRef("pk")).order_by("id")
+    Game.objects.update(
+        primary_image=Coalesce(Subquery(first.values("image")[:1]), Value("")),
+        primary_image_alt_text=Coalesce(Subquery(first.values("alt_text")[:1]), Value("")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0012_game_rating_histogram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="primary_image",
+            field=models.ImageField(blank=True, editable=False, upload_to="screenshots/"),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="primary_image_alt_text",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(populate_primary_image, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from core.utils.media import image_urls
 from core.utils.slug import generate_unique_slug
 from taxonomy.models import Genre, Platform, Tag
 
@@ -47,12 +48,30 @@ class Developer(models.Model):
         return self.name
 
 
+# Columns maintained by signals and F() updates rather than by editing the game.
+DERIVED_FIELDS = (
+    "primary_image",
+    "primary_image_alt_text",
+    "rating_sum",
+    "reviews_count",
+    "average_rating",
+    "rating_1_count",
+    "rating_2_count",
+    "rating_3_count",
+    "rating_4_count",
+    "rating_5_count",
+)
+
+
 class Game(models.Model):
     title = models.CharField(max_length=180)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     description = models.TextField()
     detailed_description = models.TextField(blank=True, default="")
     cover = models.ImageField(upload_to="games/covers/", blank=True, null=True)
+    # Copy of the first screenshot, kept current by Screenshot signals.
+    primary_image = models.ImageField(upload_to="screenshots/", blank=True, editable=False)
+    primary_image_alt_text = models.CharField(max_length=200, blank=True, editable=False)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     discount_percent = models.PositiveIntegerField(
         default=0,
@@ -79,6 +98,15 @@ class Game(models.Model):
     platforms = models.ManyToManyField(Platform, related_name="games", blank=True)
     tags = models.ManyToManyField(Tag, related_name="games", blank=True)
 
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    reviews_count = models.PositiveIntegerField(default=0, editable=False)
+    average_rating = models.FloatField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -87,6 +115,8 @@ class Game(models.Model):
         indexes = [
             models.Index(fields=["slug"], name="game_slug_idx"),
             models.Index(fields=["title"], name="game_title_idx"),
+            models.Index(fields=["price", "id"], name="game_price_id_idx"),
+            models.Index(fields=["created_at", "id"], name="game_created_id_idx"),
         ]
 
     def save(self, *args, **kwargs):
@@ -94,6 +124,13 @@ class Game(models.Model):
             self.slug = generate_unique_slug(self, self.title)
         super().save(*args, **kwargs)
 
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, *args):
+        # A plain save never writes back a stale copy of the derived columns. Only the UPDATE
+        # leaves them out: when the row is gone, the INSERT that follows writes every field.
+        if update_fields is None:
+            values = [value for value in values if value[0].name not in DERIVED_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, *args)
+
     @property
     def discounted_price(self):
         base_price = self.price if self.price is not None else Decimal("0")
@@ -103,40 +140,29 @@ class Game(models.Model):
             base_price * (Decimal("1") - (Decimal(self.discount_percent) / Decimal("100")))
         ).quantize(Decimal("0.01"))
 
+    @property
+    def rating_histogram(self):
+        return [(stars, getattr(self, f"rating_{stars}_count")) for stars in range(5, 0, -1)]
+
+    @property
+    def cover_urls(self):
+        return image_urls(self.cover)
+
     @property
     def cover_url(self):
-        if not self.cover:
-            return ""
-        try:
-            return self.cover.url
-        except Exception:
-            return ""
-
-    def _first_screenshot(self):
-        prefetched = getattr(self, "_prefetched_objects_cache", {})
-        screenshots = prefetched.get("screenshots")
-        if screenshots is not None:
-            if not screenshots:
-                return None
-            return min(screenshots, key=lambda item: item.id)
-        return self.screenshots.order_by("id").first()
+        return self.cover_urls.get("url", "")
+
+    @property
+    def primary_image_urls(self):
+        return image_urls(self.primary_image) or self.cover_urls
 
     @property
     def primary_image_url(self):
-        first_screenshot = self._first_screenshot()
-        if first_screenshot and first_screenshot.image:
-            try:
-                return first_screenshot.image.url
-            except Exception:
-                pass
-        return self.cover_url
+        return self.primary_image_urls.get("url", "")
 
     @property
     def primary_image_alt(self):
-        first_screenshot = self._first_screenshot()
-        if first_screenshot and first_screenshot.alt_text:
-            return first_screenshot.alt_text
-        return self.title
+        return self.primary_image_alt_text or self.title
 
     def __str__(self):
         return self.title
@@ -0,0 +1,231 @@
+import base64
+import binascii
+import hashlib
+import json
+import math
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from core.utils.cache import versioned_key
+
+from .cache import CATALOG_NAMESPACE, snapshot_version
+
+TOTAL_CACHE_TIMEOUT = 300
+
+GAME_SORTS = {
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+    "newest": ("created_at", True),
+}
+DEFAULT_GAME_SORT = ("created_at", True)
+RELEVANCE_GAME_SORT = ("search_rank", False)
+
+
+def resolve_game_sort(sort, q=""):
+    if sort in GAME_SORTS:
+        return GAME_SORTS[sort]
+    if q:
+        return RELEVANCE_GAME_SORT
+    return DEFAULT_GAME_SORT
+
+
+def _dump_value(value):
+    if isinstance(value, Decimal):
+        return ["d", str(value)]
+    if isinstance(value, datetime):
+        return ["t", value.isoformat()]
+    return ["v", value]
+
+
+def _load_value(kind, raw):
+    if kind == "d":
+        value = Decimal(raw)
+        if not value.is_finite():
+            raise ValueError("invalid decimal")
+        return value
+    if kind == "t":
+        value = parse_datetime(raw)
+        if value is None or value.tzinfo is None:
+            raise ValueError("invalid datetime")
+        return value
+    if kind == "v" and isinstance(raw, (int, float)) and not isinstance(raw, bool):
+        if not math.isfinite(raw):
+            raise ValueError("invalid number")
+        return raw
+    raise ValueError("invalid cursor value")
+
+
+def _sort_key(ordering):
+    field, descending = ordering
+    return f"-{field}" if descending else field
+
+
+def encode_cursor(ordering, value, pk, direction, number):
+    payload = {
+        "s": _sort_key(ordering),
+        "k": _dump_value(value),
+        "id": pk,
+        "d": direction,
+        "n": number,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, ordering, convert=None):
+    # A cursor is only valid for the sort it was issued under; anything else starts over.
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        if payload["s"] != _sort_key(ordering):
+            return None
+        kind, value = payload["k"]
+        value = _load_value(kind, value)
+        return {
+            "value": convert(value) if convert else value,
+            "id": int(payload["id"]),
+            "direction": "prev" if payload["d"] == "prev" else "next",
+            "number": max(1, int(payload.get("n", 1))),
+        }
+    except (
+        binascii.Error,
+        UnicodeDecodeError,
+        ValueError,
+        TypeError,
+        KeyError,
+        ArithmeticError,
+        ValidationError,
+    ):
+        return None
+
+
+def cursor_field(queryset, field):
+    annotation = queryset.query.annotations.get(field)
+    if annotation is not None:
+        return annotation.output_field
+    return queryset.model._meta.get_field(field)
+
+
+def cached_total(queryset, timeout=TOTAL_CACHE_TIMEOUT):
+    if queryset.query.is_empty():
+        return 0
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(f"{sql}|{params!r}".encode("utf-8")).hexdigest()
+    # Rating filters change with reviews, which move the snapshot version only.
+    key = versioned_key(CATALOG_NAMESPACE, "total", snapshot_version(), digest)
+    total = cache.get(key)
+    if total is None:
+        total = queryset.order_by().count()
+        cache.set(key, total, timeout)
+    return total
+
+
+class KeysetPage:
+    ELLIPSIS = Paginator.ELLIPSIS
+
+    def __init__(self, object_list, number, per_page, total, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.number = number
+        self.per_page = per_page
+        self.total = total
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def num_pages(self):
+        pages = max(1, -(-self.total // self.per_page))
+        return max(pages, self.number + int(self.has_next))
+
+    def elided_page_range(self, on_each_side=2, on_ends=1):
+        paginator = Paginator(range(self.num_pages * self.per_page), self.per_page)
+        return list(
+            paginator.get_elided_page_range(
+                self.number, on_each_side=on_each_side, on_ends=on_ends
+            )
+        )
+
+
+def _keyset_filter(field, descending, value, pk, forward):
+    lookup = "lt" if descending == forward else "gt"
+    return Q(**{f"{field}__{lookup}": value}) | Q(**{field: value, f"pk__{lookup}": pk})
+
+
+def _ordering(field, descending, forward):
+    prefix = "-" if descending == forward else ""
+    return (f"{prefix}{field}", f"{prefix}pk")
+
+
+def keyset_paginate(queryset, ordering, per_page, cursor=None, page=None, total=None):
+    field, descending = ordering
+    state = decode_cursor(cursor, ordering, cursor_field(queryset, field).to_python)
+    if total is None:
+        total = cached_total(queryset)
+
+    if state is not None:
+        forward = state["direction"] == "next"
+        number = state["number"]
+        window = queryset.filter(
+            _keyset_filter(field, descending, state["value"], state["id"], forward)
+        ).order_by(*_ordering(field, descending, forward))
+        rows = list(window[: per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if not forward:
+            rows.reverse()
+        has_next = has_more if forward else True
+        has_previous = True if forward else has_more
+    else:
+        number = clamp_page_number(page, total, per_page)
+        offset = (number - 1) * per_page
+        ordered = queryset.order_by(*_ordering(field, descending, True))
+        rows = list(ordered[offset : offset + per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = number > 1
+
+    return build_page(rows, number, per_page, total, ordering, has_next, has_previous)
+
+
+def clamp_page_number(page, total, per_page):
+    try:
+        number = max(1, int(page or 1))
+    except (TypeError, ValueError):
+        number = 1
+    return min(number, max(1, -(-total // per_page)))
+
+
+def build_page(rows, number, per_page, total, ordering, has_next, has_previous):
+    field = ordering[0]
+    next_cursor = previous_cursor = None
+    if rows and has_next:
+        last = rows[-1]
+        next_cursor = encode_cursor(ordering, getattr(last, field), last.pk, "next", number + 1)
+    if rows and has_previous:
+        first = rows[0]
+        previous_cursor = encode_cursor(
+            ordering, getattr(first, field), first.pk, "prev", number - 1
+        )
+
+    return KeysetPage(rows, number, per_page, total, next_cursor, previous_cursor)
@@ -0,0 +1,264 @@
+import re
+
+from django.db import OperationalError, ProgrammingError, connection
+from django.db.models import IntegerField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .pagination import (
+    RELEVANCE_GAME_SORT,
+    build_page,
+    cached_total,
+    clamp_page_number,
+    decode_cursor,
+    keyset_paginate,
+)
+
+SEARCH_MAX_TERMS = 16
+INDEX_BATCH_SIZE = 500
+
+SQLITE_TABLE = "catalog_game_fts"
+POSTGRES_TABLE = "catalog_game_search"
+
+# Column weights for bm25(): title, publisher, developer, tags, description.
+SQLITE_BM25_WEIGHTS = (10.0, 4.0, 4.0, 4.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_SOURCE_SQL = """
+    SELECT
+        g.id,
+        g.title,
+        COALESCE(p.name, ''),
+        COALESCE(d.name, ''),
+        COALESCE((
+            SELECT group_concat(t.name, ' ')
+            FROM catalog_game_tags gt
+            JOIN taxonomy_tag t ON t.id = gt.tag_id
+            WHERE gt.game_id = g.id
+        ), ''),
+        g.description || ' ' || g.detailed_description
+    FROM catalog_game g
+    LEFT JOIN catalog_publisher p ON p.id = g.publisher_id
+    LEFT JOIN catalog_developer d ON d.id = g.developer_id
+"""
+
+_POSTGRES_SOURCE_SQL = """
+    SELECT
+        g.id,
+        setweight(to_tsvector('simple', g.title), 'A')
+        || setweight(
+            to_tsvector('simple', COALESCE(p.name, '') || ' ' || COALESCE(d.name, '')), 'B'
+        )
+        || setweight(to_tsvector('simple', COALESCE((
+            SELECT string_agg(t.name, ' ')
+            FROM catalog_game_tags gt
+            JOIN taxonomy_tag t ON t.id = gt.tag_id
+            WHERE gt.game_id = g.id
+        ), '')), 'B')
+        || setweight(to_tsvector('simple', g.description || ' ' || g.detailed_description), 'C')
+    FROM catalog_game g
+    LEFT JOIN catalog_publisher p ON p.id = g.publisher_id
+    LEFT JOIN catalog_developer d ON d.id = g.developer_id
+"""
+
+_available = {}
+
+
+def search_backend():
+    vendor = connection.vendor
+    if vendor not in ("sqlite", "postgresql"):
+        return None
+    if connection.alias not in _available:
+        table = SQLITE_TABLE if vendor == "sqlite" else POSTGRES_TABLE
+        try:
+            _available[connection.alias] = table in connection.introspection.table_names()
+        except (OperationalError, ProgrammingError):
+            return None
+    return vendor if _available[connection.alias] else None
+
+
+def _chunks(values, size=INDEX_BATCH_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def index_games(game_ids):
+    backend = search_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(set(game_ids)):
+            marks = _placeholders(chunk)
+            if backend == "sqlite":
+                cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({marks})", chunk)
+                cursor.execute(
+                    f"INSERT INTO {SQLITE_TABLE} "
+                    "(rowid, title, publisher, developer, tags, description) "
+                    f"{_SQLITE_SOURCE_SQL} WHERE g.id IN ({marks})",
+                    chunk,
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO {POSTGRES_TABLE} (game_id, document) "
+                    f"{_POSTGRES_SOURCE_SQL} WHERE g.id IN ({marks}) "
+                    "ON CONFLICT (game_id) DO UPDATE SET document = EXCLUDED.document",
+                    chunk,
+                )
+
+
+def remove_games(game_ids):
+    backend = search_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(set(game_ids)):
+            marks = _placeholders(chunk)
+            if backend == "sqlite":
+                cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({marks})", chunk)
+            else:
+                cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE game_id IN ({marks})", chunk)
+
+
+def rebuild_search_index():
+    backend = search_backend()
+    if backend is None:
+        return 0
+    with connection.cursor() as cursor:
+        if backend == "sqlite":
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} "
+                "(rowid, title, publisher, developer, tags, description) "
+                f"{_SQLITE_SOURCE_SQL}"
+            )
+        else:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (game_id, document) {_POSTGRES_SOURCE_SQL}"
+            )
+        return cursor.rowcount
+
+
+def query_terms(query):
+    return _TOKEN_RE.findall((query or "").lower())[:SEARCH_MAX_TERMS]
+
+
+def _match_expression(backend, terms):
+    if backend == "sqlite":
+        return " ".join(f'"{term}"*' for term in terms)
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _match_sql(backend):
+    if backend == "sqlite":
+        return f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s"
+    return f"SELECT game_id FROM {POSTGRES_TABLE} WHERE document @@ to_tsquery('simple', %s)"
+
+
+def _ranked_sql(backend):
+    # Lower rank means a better match on both backends.
+    if backend == "sqlite":
+        weights = ", ".join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+        return (
+            f"SELECT rowid AS game_id, bm25({SQLITE_TABLE}, {weights}) AS rank "
+            f"FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s"
+        )
+    return (
+        "SELECT game_id, -ts_rank(document, query) AS rank "
+        f"FROM {POSTGRES_TABLE}, to_tsquery('simple', %s) AS query WHERE document @@ query"
+    )
+
+
+def matching_game_ids(query):
+    backend = search_backend()
+    terms = query_terms(query)
+    if backend is None or not terms:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(_match_sql(backend), [_match_expression(backend, terms)])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_games(queryset, query):
+    # Filters to every match; search_page() ranks them. Without an index fall back to icontains.
+    backend = search_backend()
+    if backend is None:
+        return (
+            queryset.filter(
+                Q(title__icontains=query)
+                | Q(publisher__name__icontains=query)
+                | Q(developer__name__icontains=query)
+                | Q(tags__name__icontains=query)
+            )
+            .annotate(search_rank=Value(0, output_field=IntegerField()))
+            .distinct()
+        )
+
+    terms = query_terms(query)
+    if not terms:
+        return queryset.none().annotate(search_rank=Value(0, output_field=IntegerField()))
+    match = RawSQL(_match_sql(backend), [_match_expression(backend, terms)])
+    return queryset.filter(pk__in=match)
+
+
+def search_page(queryset, query, per_page, cursor=None, page=None):
+    # queryset is already narrowed by search_games() and the filters; the ranking runs once
+    # over the index matches and is joined to it, so filters never see a truncated list.
+    backend = search_backend()
+    terms = query_terms(query)
+    if backend is None or not terms:
+        return keyset_paginate(queryset, RELEVANCE_GAME_SORT, per_page, cursor=cursor, page=page)
+
+    total = cached_total(queryset)
+    subquery, subquery_params = queryset.order_by().values("pk").query.sql_with_params()
+    sql = (
+        f"WITH matches AS MATERIALIZED ({_ranked_sql(backend)}) "
+        f"SELECT game_id, rank FROM matches WHERE game_id IN ({subquery})"
+    )
+    params = [_match_expression(backend, terms), *subquery_params]
+
+    state = decode_cursor(cursor, RELEVANCE_GAME_SORT, float)
+    if state is not None:
+        forward = state["direction"] == "next"
+        number = state["number"]
+        operator, direction = (">", "ASC") if forward else ("<", "DESC")
+        sql += (
+            f" AND (rank {operator} %s OR (rank = %s AND game_id {operator} %s))"
+            f" ORDER BY rank {direction}, game_id {direction} LIMIT %s"
+        )
+        params += [state["value"], state["value"], state["id"], per_page + 1]
+    else:
+        number = clamp_page_number(page, total, per_page)
+        sql += " ORDER BY rank, game_id LIMIT %s OFFSET %s"
+        params += [per_page + 1, (number - 1) * per_page]
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        ranked = db_cursor.fetchall()
+
+    has_more = len(ranked) > per_page
+    ranked = ranked[:per_page]
+    if state is not None and not forward:
+        ranked.reverse()
+    objects = queryset.in_bulk([game_id for game_id, _ in ranked])
+    rows = []
+    for game_id, rank in ranked:
+        row = objects.get(game_id)
+        if row is not None:
+            row.search_rank = rank
+            rows.append(row)
+
+    if state is None:
+        has_next, has_previous = has_more, number > 1
+    elif forward:
+        has_next, has_previous = has_more, True
+    else:
+        has_next, has_previous = True, has_more
+    return build_page(
+        rows, number, per_page, total, RELEVANCE_GAME_SORT, has_next, has_previous
+    )
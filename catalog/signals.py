@@ -0,0 +1,112 @@
+from .cache import (
+    bump_card_version,
+    bump_catalog_version,
+    bump_product_version,
+    bump_publisher_version,
+)
+from .models import Game, Screenshot
+from .search import index_games, remove_games
+from .snapshot import games_changed, invalidate_snapshot
+
+
+def catalog_changed(sender, action=None, raw=False, **kwargs):
+    if raw or (action is not None and not action.startswith("post_")):
+        return
+    bump_catalog_version()
+
+
+def publishers_changed(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_publisher_version()
+
+
+def game_cards_changed(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_card_version()
+
+
+def product_page_changed(
+    sender, instance, action=None, reverse=False, pk_set=None, raw=False, **kwargs
+):
+    if raw or (action is not None and not action.startswith("post_")):
+        return
+    if action is None:
+        game_ids = [instance.pk if sender is Game else instance.game_id]
+    elif not reverse:
+        game_ids = [instance.pk]
+    else:
+        game_ids = pk_set or ()
+    for game_id in game_ids:
+        bump_product_version(game_id)
+
+
+def refresh_primary_image(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    first = (
+        Screenshot.objects.filter(game_id=instance.game_id)
+        .order_by("id")
+        .values("image", "alt_text")
+        .first()
+    )
+    Game.objects.filter(pk=instance.game_id).update(
+        primary_image=first["image"] if first else "",
+        primary_image_alt_text=first["alt_text"] if first else "",
+    )
+
+
+def patch_snapshot(
+    sender, instance, action=None, reverse=False, pk_set=None, raw=False, **kwargs
+):
+    if raw or (action is not None and not action.startswith("post_")):
+        return
+    if sender is Game:
+        games_changed([instance.pk])
+    elif action is None:
+        invalidate_snapshot()
+    elif not reverse:
+        games_changed([instance.pk])
+    elif pk_set is not None:
+        games_changed(pk_set)
+    else:
+        invalidate_snapshot()
+
+
+def reindex_game(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_games([instance.pk])
+
+
+def unindex_game(sender, instance, **kwargs):
+    remove_games([instance.pk])
+
+
+def reindex_game_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            index_games([instance.pk])
+        return
+
+    if action == "pre_clear":
+        instance._search_game_ids = list(instance.games.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove"):
+        index_games(pk_set or [])
+    elif action == "post_clear":
+        index_games(getattr(instance, "_search_game_ids", []))
+
+
+def reindex_related_games(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    index_games(instance.games.values_list("id", flat=True))
+
+
+def remember_related_games(sender, instance, **kwargs):
+    instance._search_game_ids = list(instance.games.values_list("id", flat=True))
+
+
+def reindex_remembered_games(sender, instance, **kwargs):
+    index_games(getattr(instance, "_search_game_ids", []))
@@ -0,0 +1,449 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.utils.cache import bump_version
+from taxonomy.models import Genre, Platform, Tag
+
+from .cache import SNAPSHOT_NAMESPACE, snapshot_version
+from .models import Game, Publisher
+from .pagination import RELEVANCE_GAME_SORT, build_page, clamp_page_number, decode_cursor
+from .search import matching_game_ids, search_backend
+
+SNAPSHOT_MAX_AGE = 300
+SNAPSHOT_CHANGES_TIMEOUT = SNAPSHOT_MAX_AGE * 2
+# Further behind than this, rebuilding is cheaper than replaying the change log.
+SNAPSHOT_CHANGES_MAX = 500
+ALL_GAMES = "all"
+
+FILTERS = ("genre", "platform", "publisher", "tag")
+RATING_FACET_OPTIONS = ("4.5", "4", "3", "2", "1")
+MEMBERSHIPS = (
+    ("genre", Game.genres.through, "genre_id"),
+    ("platform", Game.platforms.through, "platform_id"),
+    ("tag", Game.tags.through, "tag_id"),
+)
+COLUMNS = (
+    "id",
+    "price",
+    "discount_percent",
+    "created_at",
+    "release_year",
+    "average_rating",
+    "publisher_id",
+)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+_snapshot = None
+
+
+def _bitmap(positions, size):
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _to_cents(value):
+    return int((Decimal(value) * 100).to_integral_value())
+
+
+def _to_micros(value):
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+# Per-process copy of the active catalog. Facet membership is kept as one bitmap per option
+# (bit N = the game at position N); shop pages and facet counts both read these bitmaps.
+class CatalogSnapshot:
+    def __init__(self, version):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.ids = array("q")
+        self.price = array("q")
+        self.discount = array("H")
+        self.created = array("q")
+        self.release_year = array("h")
+        self.rating = array("d")
+        self.publisher = array("q")
+        self.alive = bytearray()
+        self.alive_bits = 0
+        self.positions = {}
+        # Options are integer-coded by primary key; codes maps slug -> code.
+        self.codes = {facet: {} for facet in FILTERS}
+        self.bitmaps = {facet: defaultdict(int) for facet in FILTERS}
+        self.rating_bitmaps = {option: 0 for option in RATING_FACET_OPTIONS}
+        self.game_codes = {facet: {} for facet, _, _ in MEMBERSHIPS}
+        self._orders = {}
+
+    @classmethod
+    def build(cls, version):
+        snapshot = cls(version)
+        snapshot.codes = {
+            "genre": dict(Genre.objects.values_list("slug", "id")),
+            "platform": dict(Platform.objects.values_list("slug", "id")),
+            "publisher": dict(Publisher.objects.values_list("slug", "id")),
+            "tag": dict(Tag.objects.values_list("slug", "id")),
+        }
+        rows = Game.objects.filter(is_active=True).order_by("id").values_list(*COLUMNS)
+        for row in rows.iterator():
+            snapshot._append(row)
+        size = len(snapshot.ids)
+        snapshot.alive_bits = (1 << size) - 1
+
+        grouped = {facet: defaultdict(list) for facet in FILTERS}
+        for position, publisher_id in enumerate(snapshot.publisher):
+            if publisher_id:
+                grouped["publisher"][publisher_id].append(position)
+        for facet, through, column in MEMBERSHIPS:
+            pairs = through.objects.filter(game__is_active=True).values_list("game_id", column)
+            codes = defaultdict(list)
+            for game_id, code in pairs.iterator():
+                # The games were read by an earlier query; rows for games activated since
+                # are skipped here and arrive with the patch for that change.
+                position = snapshot.positions.get(game_id)
+                if position is None:
+                    continue
+                codes[position].append(code)
+                grouped[facet][code].append(position)
+            snapshot.game_codes[facet] = {
+                position: tuple(codes.get(position, ())) for position in range(size)
+            }
+        for facet in FILTERS:
+            for code, positions in grouped[facet].items():
+                snapshot.bitmaps[facet][code] = _bitmap(positions, size)
+        ratings = snapshot.rating
+        for option in RATING_FACET_OPTIONS:
+            minimum = float(option)
+            snapshot.rating_bitmaps[option] = _bitmap(
+                (position for position in range(size) if ratings[position] >= minimum), size
+            )
+        return snapshot
+
+    def is_expired(self):
+        return time.monotonic() - self.built_at >= SNAPSHOT_MAX_AGE
+
+    def is_fresh(self, version):
+        return not self.is_expired() and self.version == version
+
+    def _values(self, row):
+        game_id, price, discount, created_at, release_year, rating, publisher_id = row
+        return (
+            game_id,
+            _to_cents(price),
+            discount or 0,
+            _to_micros(created_at),
+            release_year,
+            rating or 0.0,
+            publisher_id or 0,
+            1,
+        )
+
+    def _columns(self):
+        return (
+            self.ids,
+            self.price,
+            self.discount,
+            self.created,
+            self.release_year,
+            self.rating,
+            self.publisher,
+            self.alive,
+        )
+
+    def _append(self, row):
+        position = len(self.ids)
+        self.positions[row[0]] = position
+        for column, value in zip(self._columns(), self._values(row)):
+            column.append(value)
+        return position
+
+    def _set_bit(self, bitmaps, key, position, value):
+        if value:
+            bitmaps[key] |= 1 << position
+        else:
+            bitmaps[key] &= ~(1 << position)
+
+    def _link(self, position, codes):
+        publisher_id = self.publisher[position]
+        if publisher_id:
+            self._set_bit(self.bitmaps["publisher"], publisher_id, position, True)
+        for facet, _, _ in MEMBERSHIPS:
+            self.game_codes[facet][position] = tuple(codes[facet])
+            for code in codes[facet]:
+                self._set_bit(self.bitmaps[facet], code, position, True)
+        rating = self.rating[position]
+        for option in RATING_FACET_OPTIONS:
+            self._set_bit(self.rating_bitmaps, option, position, rating >= float(option))
+        self.alive_bits |= 1 << position
+
+    def _unlink(self, position):
+        publisher_id = self.publisher[position]
+        if publisher_id:
+            self._set_bit(self.bitmaps["publisher"], publisher_id, position, False)
+        for facet, _, _ in MEMBERSHIPS:
+            for code in self.game_codes[facet].pop(position, ()):
+                self._set_bit(self.bitmaps[facet], code, position, False)
+        for option in RATING_FACET_OPTIONS:
+            self._set_bit(self.rating_bitmaps, option, position, False)
+        self.alive_bits &= ~(1 << position)
+        self.alive[position] = 0
+
+    def patch(self, game_ids):
+        game_ids = set(game_ids)
+        rows = list(Game.objects.filter(pk__in=game_ids, is_active=True).values_list(*COLUMNS))
+        codes = {row[0]: {facet: [] for facet, _, _ in MEMBERSHIPS} for row in rows}
+        for facet, through, column in MEMBERSHIPS:
+            pairs = through.objects.filter(game_id__in=list(codes)).values_list("game_id", column)
+            for game_id, code in pairs:
+                codes[game_id][facet].append(code)
+        for game_id in game_ids:
+            position = self.positions.get(game_id)
+            if position is not None and self.alive[position]:
+                self._unlink(position)
+        for row in rows:
+            position = self.positions.get(row[0])
+            if position is None:
+                position = self._append(row)
+            else:
+                for column, value in zip(self._columns(), self._values(row)):
+                    column[position] = value
+            self._link(position, codes[row[0]])
+        self._orders.clear()
+
+    def _column(self, field):
+        return {"price": self.price, "created_at": self.created}[field]
+
+    def _cursor_key(self, field, value):
+        value = Game._meta.get_field(field).to_python(value)
+        if field == "price":
+            return _to_cents(value)
+        return _to_micros(value)
+
+    def _sorted(self, field):
+        order = self._orders.get(field)
+        if order is None:
+            column = self._column(field)
+            ids = self.ids
+            alive = self.alive
+            order = sorted(
+                (position for position in range(len(ids)) if alive[position]),
+                key=lambda position: (column[position], ids[position]),
+            )
+            self._orders[field] = order
+        return order
+
+    def rating_bitmap(self, minimum):
+        option = next((key for key in RATING_FACET_OPTIONS if float(key) == minimum), None)
+        if option is not None:
+            return self.rating_bitmaps[option]
+        ratings = self.rating
+        return self.alive_bits & _bitmap(
+            (position for position in range(len(ratings)) if ratings[position] >= minimum),
+            len(ratings),
+        )
+
+    def ids_bitmap(self, game_ids):
+        positions = self.positions
+        bits = _bitmap(
+            (positions[game_id] for game_id in game_ids if game_id in positions), len(self.ids)
+        )
+        return bits & self.alive_bits
+
+    def filter_bitmaps(self, filters, rating=None):
+        selected = {}
+        for facet in FILTERS:
+            slug = filters.get(facet)
+            if slug:
+                code = self.codes[facet].get(slug)
+                selected[facet] = self.bitmaps[facet].get(code, 0) if code is not None else 0
+        if rating is not None:
+            selected["rating"] = self.rating_bitmap(rating)
+        return selected
+
+    def select(self, filters, rating=None, query_ids=None):
+        candidates = self.alive_bits
+        if query_ids is not None:
+            candidates &= self.ids_bitmap(query_ids)
+        for bits in self.filter_bitmaps(filters, rating=rating).values():
+            candidates &= bits
+        return candidates
+
+    def counts(self, selected, rating=None, query_ids=None):
+        base = self.alive_bits
+        if query_ids is not None:
+            base &= self.ids_bitmap(query_ids)
+        filters = self.filter_bitmaps(selected, rating=rating)
+
+        result = {}
+        for facet in FILTERS + ("rating",):
+            # Each facet is counted against every filter except its own.
+            scope = base
+            for other, bits in filters.items():
+                if other != facet:
+                    scope &= bits
+            if facet == "rating":
+                options = self.rating_bitmaps
+            else:
+                bitmaps = self.bitmaps[facet]
+                options = {slug: bitmaps.get(code, 0) for slug, code in self.codes[facet].items()}
+            result[facet] = {key: (scope & bits).bit_count() for key, bits in options.items()}
+        return result
+
+    def page(
+        self, filters, ordering, per_page, cursor=None, page=None, rating=None, query_ids=None
+    ):
+        field, descending = ordering
+        candidates = self.select(filters, rating=rating, query_ids=query_ids)
+        total = candidates.bit_count()
+        mask = candidates.to_bytes((len(self.ids) + 7) // 8, "little")
+        ids = self.ids
+        order = self._sorted(field)
+        column = self._column(field)
+
+        def sort_key(position):
+            return (column[position], ids[position])
+
+        def take(walk, limit, skip=0):
+            taken = []
+            for index in walk:
+                position = order[index]
+                if not mask[position >> 3] >> (position & 7) & 1:
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                taken.append(position)
+                if len(taken) >= limit:
+                    break
+            return taken
+
+        state = decode_cursor(cursor, ordering, lambda value: self._cursor_key(field, value))
+        if state is not None:
+            forward = state["direction"] == "next"
+            number = state["number"]
+            key = (state["value"], state["id"])
+            if descending != forward:
+                walk = range(bisect_right(order, key, key=sort_key), len(order))
+            else:
+                walk = range(bisect_left(order, key, key=sort_key) - 1, -1, -1)
+            positions = take(walk, per_page + 1)
+            has_more = len(positions) > per_page
+            positions = positions[:per_page]
+            if not forward:
+                positions.reverse()
+            has_next = has_more if forward else True
+            has_previous = True if forward else has_more
+        else:
+            number = clamp_page_number(page, total, per_page)
+            walk = range(len(order) - 1, -1, -1) if descending else range(len(order))
+            positions = take(walk, per_page + 1, skip=(number - 1) * per_page)
+            has_next = len(positions) > per_page
+            positions = positions[:per_page]
+            has_previous = number > 1
+
+        return [ids[position] for position in positions], number, total, has_next, has_previous
+
+
+def _changes_key(version):
+    return f"{SNAPSHOT_NAMESPACE}:changes:{version}"
+
+
+def _publish_changes(game_ids):
+    # Each change gets the next snapshot version; every process replays the entries it
+    # missed from this log instead of rebuilding. ALL_GAMES asks for a rebuild.
+    version = bump_version(SNAPSHOT_NAMESPACE)
+    cache.set(_changes_key(version), game_ids, SNAPSHOT_CHANGES_TIMEOUT)
+    return version
+
+
+def _catch_up(snapshot, version):
+    if snapshot.is_expired() or not 0 < version - snapshot.version <= SNAPSHOT_CHANGES_MAX:
+        return False
+    keys = [_changes_key(missed) for missed in range(snapshot.version + 1, version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys) or ALL_GAMES in changes.values():
+        return False
+    with _lock:
+        snapshot.patch(set().union(*changes.values()))
+        snapshot.version = version
+    return True
+
+
+def get_snapshot(wait=False):
+    global _snapshot
+    version = snapshot_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh(version):
+        return snapshot
+    # Only one request catches up or rebuilds. Meanwhile page requests fall back to SQL and
+    # callers that wait (facet counts) keep reading the previous snapshot; only a cold
+    # start blocks.
+    if not _rebuild_lock.acquire(blocking=wait and snapshot is None):
+        return snapshot if wait else None
+    try:
+        snapshot = _snapshot
+        version = snapshot_version()
+        if snapshot is not None and (snapshot.is_fresh(version) or _catch_up(snapshot, version)):
+            return snapshot
+        snapshot = CatalogSnapshot.build(version)
+        with _lock:
+            _snapshot = snapshot
+        return snapshot
+    finally:
+        _rebuild_lock.release()
+
+
+def games_changed(game_ids):
+    # Published now for readers inside this transaction and again once committed, like
+    # bump_version_on_commit; processes patch their snapshots from the log on the next read.
+    game_ids = list(game_ids)
+    _publish_changes(game_ids)
+    transaction.on_commit(lambda: _publish_changes(game_ids))
+
+
+def invalidate_snapshot():
+    _publish_changes(ALL_GAMES)
+    transaction.on_commit(lambda: _publish_changes(ALL_GAMES))
+
+
+def snapshot_page(
+    queryset, ordering, per_page, cursor=None, page=None, q="", rating=None, **filters
+):
+    # Relevance ranking is paged by the search index itself (search_page).
+    if q and (ordering == RELEVANCE_GAME_SORT or search_backend() is None):
+        return None
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return None
+
+    query_ids = matching_game_ids(q) if q else None
+    with _lock:
+        game_ids, number, total, has_next, has_previous = snapshot.page(
+            filters,
+            ordering,
+            per_page,
+            cursor=cursor,
+            page=page,
+            rating=rating,
+            query_ids=query_ids,
+        )
+
+    objects = queryset.in_bulk(game_ids)
+    rows = [objects[game_id] for game_id in game_ids if game_id in objects]
+    return build_page(rows, number, per_page, total, ordering, has_next, has_previous)
+
+
+def snapshot_facet_counts(selected, rating=None, query_ids=None):
+    snapshot = get_snapshot(wait=True)
+    with _lock:
+        return snapshot.counts(selected, rating=rating, query_ids=query_ids)
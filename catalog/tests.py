@@ -0,0 +1,352 @@
+import base64
+import json
+import random
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog import snapshot
+from catalog.facets import facet_counts
+from catalog.models import Game, Publisher
+from catalog.pagination import GAME_SORTS, decode_cursor, encode_cursor, keyset_paginate
+from catalog.search import matching_game_ids, rebuild_search_index
+from catalog.snapshot import RATING_FACET_OPTIONS, snapshot_page
+from taxonomy.models import Genre, Platform, Tag
+
+
+def create_game(title, **fields):
+    fields.setdefault("description", "x")
+    fields.setdefault("price", Decimal("10.00"))
+    fields.setdefault("release_year", 2020)
+    return Game.objects.create(title=title, **fields)
+
+
+class GameSaveTests(TestCase):
+    def test_save_keeps_derived_columns_written_meanwhile(self):
+        game = create_game("Space Raiders")
+        Game.objects.filter(pk=game.pk).update(reviews_count=3, rating_sum=12)
+        game.title = "Space Raiders II"
+        game.save()
+        game.refresh_from_db()
+        self.assertEqual(
+            (game.title, game.reviews_count, game.rating_sum), ("Space Raiders II", 3, 12)
+        )
+
+    def test_save_updates_without_reading_the_row_first(self):
+        game = create_game("Space Raiders")
+        game.title = "Space Raiders II"
+        with CaptureQueriesContext(connection) as queries:
+            game.save()
+        statement = queries.captured_queries[0]["sql"]
+        self.assertTrue(statement.startswith("UPDATE"), statement)
+        self.assertNotIn("rating_sum", statement)
+
+    def test_save_reinserts_a_deleted_row(self):
+        game = create_game("Space Raiders")
+        Game.objects.filter(pk=game.pk).delete()
+        game.title = "Back Again"
+        game.save()
+        self.assertEqual(Game.objects.get(pk=game.pk).title, "Back Again")
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_index_follows_related_changes(self):
+        publisher = Publisher.objects.create(name="Nova Interactive")
+        raiders = create_game("Space Raiders", publisher=publisher)
+        farm = create_game("Farm Life", description="space farming sim")
+        tag = Tag.objects.create(name="Roguelike")
+        farm.tags.add(tag)
+
+        self.assertEqual(set(matching_game_ids("space")), {raiders.pk, farm.pk})
+        self.assertEqual(matching_game_ids("rogue"), [farm.pk])
+        publisher.name = "Stellar"
+        publisher.save()
+        self.assertEqual(matching_game_ids("stell"), [raiders.pk])
+        farm.tags.clear()
+        self.assertEqual(matching_game_ids("rogue"), [])
+        raiders.delete()
+        self.assertEqual(matching_game_ids("space"), [farm.pk])
+
+    def test_relevance_ranks_title_matches_first(self):
+        raiders = create_game("Space Raiders")
+        farm = create_game("Farm Life", description="space farming sim")
+        response = self.client.get(reverse("api_app:api_games_list"), {"q": "space"})
+        items = response.json()["data"]["items"]
+        self.assertEqual([item["slug"] for item in items], [raiders.slug, farm.slug])
+        response = self.client.get(reverse("pages:shop"), {"q": "space"})
+        self.assertEqual([game.pk for game in response.context["games"]], [raiders.pk, farm.pk])
+
+    def test_filtered_search_is_not_truncated(self):
+        Game.objects.bulk_create(
+            [
+                Game(
+                    title=f"Alpha {index}",
+                    slug=f"alpha-{index}",
+                    description="x",
+                    price=Decimal("10.00"),
+                    release_year=2020,
+                )
+                for index in range(1010)
+            ]
+        )
+        rebuild_search_index()
+        platform = Platform.objects.create(name="PC", slug="pc")
+        platform.games.add(*Game.objects.order_by("pk")[:5])
+
+        url = reverse("api_app:api_games_list")
+        response = self.client.get(url, {"q": "alpha"})
+        self.assertEqual(response.json()["data"]["pagination"]["total"], 1010)
+        response = self.client.get(url, {"q": "alpha", "platform": "pc"})
+        self.assertEqual(response.json()["data"]["pagination"]["total"], 5)
+        response = self.client.get(reverse("pages:shop"), {"q": "alpha", "platform": "pc"})
+        self.assertEqual(response.context["games"].total, 5)
+        self.assertEqual(response.context["facets"]["platform"]["pc"], 5)
+
+    def test_relevance_cursors_walk_every_match(self):
+        for index in range(25):
+            create_game(f"Alpha {index}", description="alpha " * (index % 4))
+        url = reverse("api_app:api_games_list")
+        seen = []
+        params = {"q": "alpha"}
+        while True:
+            data = self.client.get(url, params).json()["data"]
+            seen.extend(item["slug"] for item in data["items"])
+            cursor = data["pagination"]["next"]
+            if cursor is None:
+                break
+            params = {"q": "alpha", "cursor": cursor}
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+        previous = self.client.get(url, {"q": "alpha", "cursor": data["pagination"]["prev"]})
+        self.assertEqual([item["slug"] for item in previous.json()["data"]["items"]], seen[10:20])
+
+
+class SnapshotTests(TestCase):
+    filters = (
+        {},
+        {"platform": "p1"},
+        {"genre": "g0", "platform": "p2"},
+        {"publisher": "studio-1", "tag": "t0"},
+        {"tag": "t1", "rating": 3.0},
+        {"q": "space", "platform": "p0"},
+    )
+
+    def setUp(self):
+        cache.clear()
+        snapshot.invalidate_snapshot()
+        generator = random.Random(7)
+        self.platforms = [Platform.objects.create(name=f"P{index}") for index in range(3)]
+        self.genres = [Genre.objects.create(name=f"G{index}") for index in range(3)]
+        self.tags = [Tag.objects.create(name=f"T{index}") for index in range(2)]
+        publishers = [Publisher.objects.create(name=f"Studio {index}") for index in range(2)]
+        for index in range(40):
+            game = create_game(
+                f"Space {index}" if index % 2 else f"Farm {index}",
+                price=Decimal(generator.randint(1, 5)),
+                publisher=publishers[index % 3] if index % 3 < 2 else None,
+                is_active=index % 7 != 0,
+            )
+            game.platforms.set(generator.sample(self.platforms, 2))
+            game.genres.set(generator.sample(self.genres, 1))
+            game.tags.set(generator.sample(self.tags, generator.randint(0, 2)))
+            Game.objects.filter(pk=game.pk).update(average_rating=generator.choice([0, 2.5, 4.0]))
+
+    def sql_queryset(self, q="", rating=None, **filters):
+        queryset = Game.objects.filter(is_active=True)
+        if q:
+            queryset = queryset.filter(pk__in=matching_game_ids(q))
+        for facet in ("genre", "platform", "tag"):
+            if filters.get(facet):
+                queryset = queryset.filter(**{f"{facet}s__slug": filters[facet]})
+        if filters.get("publisher"):
+            queryset = queryset.filter(publisher__slug=filters["publisher"])
+        if rating is not None:
+            queryset = queryset.filter(average_rating__gte=rating)
+        return queryset.distinct()
+
+    def walk(self, paginate):
+        pages = [paginate(None)]
+        while pages[-1].next_cursor:
+            pages.append(paginate(pages[-1].next_cursor))
+        return [[game.pk for game in page] for page in pages], pages[0].total
+
+    def assertMatchesSql(self):
+        queryset = Game.objects.filter(is_active=True)
+        for ordering in GAME_SORTS.values():
+            for filters in self.filters:
+                memory = self.walk(
+                    lambda cursor: snapshot_page(queryset, ordering, 7, cursor=cursor, **filters)
+                )
+                sql = self.walk(
+                    lambda cursor: keyset_paginate(
+                        self.sql_queryset(**filters), ordering, 7, cursor=cursor
+                    )
+                )
+                self.assertEqual(memory, sql, (ordering, filters))
+
+    def assertCountsMatchSql(self):
+        for filters in self.filters:
+            counts = facet_counts(**filters)
+            for facet, model in (("platform", Platform), ("genre", Genre), ("tag", Tag)):
+                others = {key: value for key, value in filters.items() if key != facet}
+                expected = dict(
+                    model.objects.filter(games__in=self.sql_queryset(**others))
+                    .values_list("slug")
+                    .annotate(total=Count("games", distinct=True))
+                )
+                for slug, total in counts[facet].items():
+                    self.assertEqual(total, expected.get(slug, 0), (facet, filters))
+            others = {key: value for key, value in filters.items() if key != "rating"}
+            for option in RATING_FACET_OPTIONS:
+                expected = self.sql_queryset(rating=float(option), **others).count()
+                self.assertEqual(counts["rating"][option], expected, (option, filters))
+
+    def test_pages_and_counts_match_sql(self):
+        self.assertMatchesSql()
+        self.assertCountsMatchSql()
+
+    def test_changes_are_patched_without_a_rebuild(self):
+        self.assertMatchesSql()
+        with mock.patch.object(snapshot.CatalogSnapshot, "build") as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                game = Game.objects.filter(is_active=True).order_by("pk").first()
+                game.price = Decimal("4.50")
+                game.save()
+                game.platforms.set([self.platforms[1]])
+                game.tags.add(self.tags[0])
+                Game.objects.filter(pk=game.pk).update(average_rating=5)
+                snapshot.games_changed([game.pk])
+                retired = Game.objects.filter(is_active=True).order_by("-pk").first()
+                retired.is_active = False
+                retired.save()
+                added = create_game("Space Late", price=Decimal("1.00"))
+                added.platforms.add(self.platforms[0], self.platforms[1])
+            self.assertMatchesSql()
+            self.assertCountsMatchSql()
+        build.assert_not_called()
+
+    def test_changes_from_other_processes_are_replayed_from_the_log(self):
+        current = snapshot.get_snapshot()
+        first, second = Game.objects.filter(is_active=True).order_by("pk")[:2]
+        with mock.patch.object(snapshot.CatalogSnapshot, "build") as build:
+            # Another process changed the first game and published it without patching here.
+            Game.objects.filter(pk=first.pk).update(price=Decimal("0.50"))
+            snapshot._publish_changes([first.pk])
+            with self.captureOnCommitCallbacks(execute=True):
+                second.price = Decimal("0.75")
+                second.save()
+            self.assertLess(current.version, snapshot.snapshot_version())
+            self.assertIs(snapshot.get_snapshot(), current)
+            self.assertEqual(current.version, snapshot.snapshot_version())
+            self.assertMatchesSql()
+        build.assert_not_called()
+
+    def test_missing_log_entries_rebuild(self):
+        current = snapshot.get_snapshot()
+        game = Game.objects.filter(is_active=True).first()
+        Game.objects.filter(pk=game.pk).update(price=Decimal("0.50"))
+        version = snapshot._publish_changes([game.pk])
+        cache.delete(snapshot._changes_key(version))
+        rebuilt = snapshot.get_snapshot()
+        self.assertIsNot(rebuilt, current)
+        self.assertEqual(rebuilt.version, version)
+        self.assertMatchesSql()
+
+    def test_build_skips_games_activated_while_it_reads(self):
+        inactive = Game.objects.filter(is_active=False).first()
+        append = snapshot.CatalogSnapshot._append
+
+        def append_then_activate(catalog, row):
+            Game.objects.filter(pk=inactive.pk).update(is_active=True)
+            return append(catalog, row)
+
+        with mock.patch.object(
+            snapshot.CatalogSnapshot, "_append", autospec=True, side_effect=append_then_activate
+        ):
+            built = snapshot.CatalogSnapshot.build(0)
+        self.assertNotIn(inactive.pk, built.positions)
+        self.assertEqual(len(built.ids), Game.objects.filter(is_active=True).count() - 1)
+
+    def test_facet_counts_read_the_previous_snapshot_during_a_rebuild(self):
+        counts = facet_counts()
+        previous = snapshot.get_snapshot()
+        snapshot.invalidate_snapshot()
+        with snapshot._rebuild_lock:
+            self.assertIsNone(snapshot.get_snapshot())
+            self.assertIs(snapshot.get_snapshot(wait=True), previous)
+            self.assertEqual(facet_counts(), counts)
+        self.assertIsNot(snapshot.get_snapshot(), previous)
+
+
+def forge_cursor(payload):
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+class CursorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        snapshot.invalidate_snapshot()
+        for index in range(12):
+            create_game(f"Space {index}", price=Decimal(index + 1))
+        self.url = reverse("api_app:api_games_list")
+
+    def fetch(self, params, sql=False):
+        if sql:
+            with mock.patch("api_app.views.snapshot_page", return_value=None):
+                return self.fetch(params)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, params)
+        return response.json()["data"]
+
+    def test_cursor_round_trips_only_under_its_sort(self):
+        newest = GAME_SORTS["newest"]
+        game = Game.objects.first()
+        cursor = encode_cursor(newest, game.created_at, game.pk, "next", 2)
+        state = decode_cursor(cursor, newest)
+        self.assertEqual(
+            (state["value"], state["id"], state["number"]), (game.created_at, game.pk, 2)
+        )
+        self.assertIsNone(decode_cursor(cursor, GAME_SORTS["price_asc"]))
+        self.assertIsNone(decode_cursor(cursor, ("created_at", False)))
+
+    def test_foreign_and_tampered_cursors_start_over(self):
+        first = [item["slug"] for item in self.fetch({"sort": "price_asc"})["items"]]
+        moment = "2020-01-01T00:00:00+00:00"
+        cursors = [
+            self.fetch({"sort": "newest"})["pagination"]["next"],
+            forge_cursor({"s": "price", "k": ["v", "abc"], "id": 1, "d": "next", "n": 2}),
+            forge_cursor({"s": "price", "k": ["d", "abc"], "id": 1, "d": "next", "n": 2}),
+            forge_cursor({"s": "price", "k": ["t", moment], "id": 1, "d": "next", "n": 2}),
+            forge_cursor({"s": "price", "k": ["d", "5"], "id": "x", "d": "next", "n": 2}),
+            "not-a-cursor",
+        ]
+        for cursor in cursors:
+            for sql in (False, True):
+                data = self.fetch({"sort": "price_asc", "cursor": cursor}, sql=sql)
+                self.assertEqual([item["slug"] for item in data["items"]], first, cursor)
+                self.assertEqual(data["pagination"]["page"], 1)
+
+    def test_tampered_relevance_and_shop_cursors_start_over(self):
+        cases = (
+            ("", "search_rank", ["v", "abc"]),
+            ("newest", "-created_at", ["d", "1.5"]),
+            ("price_desc", "-price", ["t", "x"]),
+        )
+        for sort, key, value in cases:
+            cursor = forge_cursor({"s": key, "k": value, "id": 1, "d": "next", "n": 2})
+            data = self.fetch({"q": "space", "sort": sort, "cursor": cursor})
+            self.assertEqual(data["pagination"]["page"], 1)
+            response = self.client.get(reverse("pages:shop"), {"sort": sort, "cursor": cursor})
+            self.assertEqual(response.status_code, 200, sort)
+            self.assertEqual(response.context["games"].number, 1)
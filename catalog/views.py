@@ -1,10 +1,22 @@
-from django.core.paginator import Paginator
-from django.db.models import Avg, Q
 from django.shortcuts import render
 
+from taxonomy.cache import taxonomy_options
 from taxonomy.models import Platform, Tag
 
-from .models import Game, Publisher
+from .cache import publisher_options
+from .cards import attach_game_cards
+from .facets import facet_counts
+from .models import Game
+from .pagination import RELEVANCE_GAME_SORT, keyset_paginate, resolve_game_sort
+from .search import search_games, search_page
+from .snapshot import RATING_FACET_OPTIONS, snapshot_page
+
+
+def _facet_options(items, counts):
+    return [
+        {"name": item["name"], "slug": item["slug"], "count": counts.get(item["slug"], 0)}
+        for item in items
+    ]
 
 
 def shop(request):
@@ -15,60 +27,71 @@ def shop(request):
     rating = request.GET.get("rating", "").strip()
     sort = request.GET.get("sort", "").strip()
 
-    games_qs = (
-        Game.objects.filter(is_active=True)
-        .select_related("publisher")
-        .prefetch_related("platforms", "tags", "screenshots")
-        .annotate(average_rating=Avg("reviews__rating"))
-    )
-
-    if q:
-        games_qs = games_qs.filter(
-            Q(title__icontains=q)
-            | Q(publisher__name__icontains=q)
-            | Q(tags__name__icontains=q)
-        )
-    if platform:
-        games_qs = games_qs.filter(platforms__slug=platform)
-    if publisher:
-        games_qs = games_qs.filter(publisher__slug=publisher)
-    if tag:
-        games_qs = games_qs.filter(tags__slug=tag)
+    rating_value = None
     if rating:
         try:
             rating_value = float(rating)
         except ValueError:
             rating_value = None
-        if rating_value is not None and 0 <= rating_value <= 5:
-            games_qs = games_qs.filter(average_rating__gte=rating_value)
+        if rating_value is not None and not 0 <= rating_value <= 5:
+            rating_value = None
 
-    if sort == "price_asc":
-        games_qs = games_qs.order_by("price")
-    elif sort == "price_desc":
-        games_qs = games_qs.order_by("-price")
-    elif sort == "newest":
-        games_qs = games_qs.order_by("-created_at")
-    else:
-        games_qs = games_qs.order_by("-created_at")
+    base_qs = Game.objects.filter(is_active=True).select_related("publisher")
+    ordering = resolve_game_sort(sort, q)
+    cursor = request.GET.get("cursor")
+    page = request.GET.get("page")
 
-    games_qs = games_qs.distinct()
+    games = snapshot_page(
+        base_qs,
+        ordering,
+        9,
+        cursor=cursor,
+        page=page,
+        q=q,
+        rating=rating_value,
+        platform=platform,
+        publisher=publisher,
+        tag=tag,
+    )
+    if games is None:
+        games_qs = base_qs
+        if q:
+            games_qs = search_games(games_qs, q)
+        if platform:
+            games_qs = games_qs.filter(platforms__slug=platform)
+        if publisher:
+            games_qs = games_qs.filter(publisher__slug=publisher)
+        if tag:
+            games_qs = games_qs.filter(tags__slug=tag)
+        if rating_value is not None:
+            games_qs = games_qs.filter(average_rating__gte=rating_value)
+        if ordering == RELEVANCE_GAME_SORT:
+            games = search_page(games_qs.distinct(), q, 9, cursor=cursor, page=page)
+        else:
+            games = keyset_paginate(games_qs.distinct(), ordering, 9, cursor=cursor, page=page)
 
-    paginator = Paginator(games_qs, 9)
-    page_number = request.GET.get("page")
-    games = paginator.get_page(page_number)
+    attach_game_cards(games.object_list, "components/game_card.html")
 
     query_params = request.GET.copy()
-    if "genre" in query_params:
-        query_params.pop("genre")
-    if "page" in query_params:
-        query_params.pop("page")
+    for param in ("genre", "page", "cursor"):
+        if param in query_params:
+            query_params.pop(param)
     query_string = query_params.urlencode()
 
+    facets = facet_counts(
+        q=q, platform=platform, publisher=publisher, tag=tag, rating=rating_value
+    )
+
     context = {
         "games": games,
-        "platforms": Platform.objects.all(),
-        "publishers": Publisher.objects.all(),
-        "tags": Tag.objects.all(),
+        "page_range": games.elided_page_range(),
+        "platforms": _facet_options(taxonomy_options(Platform), facets["platform"]),
+        "publishers": _facet_options(publisher_options(), facets["publisher"]),
+        "tags": _facet_options(taxonomy_options(Tag), facets["tag"]),
+        "rating_options": [
+            {"value": value, "count": facets["rating"][value]} for value in RATING_FACET_OPTIONS
+        ],
+        "facets": facets,
         "q": q,
         "platform": platform,
         "publisher": publisher,
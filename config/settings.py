@@ -80,6 +80,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "cart.middleware.AnonymousCartMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -96,6 +97,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "accounts.context_processors.chrome",
             ],
         },
     },
@@ -111,6 +113,11 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Take the write lock when a transaction starts so concurrent checkouts queue
+        # instead of failing with "database is locked" on lock upgrade.
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        # File-backed so tests can open several connections (see orders concurrency tests).
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -122,6 +129,28 @@ if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
     print(f"[DB DIAG] in onedrive path: {'OneDrive' in str(DB_FILE_PATH)}")
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/ref/settings/#caches
+
+# Version counters, cached roles and order status counts live in the cache, so every web
+# worker and management command has to reach the same one. Local memory is only correct
+# when a single process serves the site (see core.checks).
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -176,9 +205,21 @@ CLOUDINARY_STORAGE = {
     "API_SECRET": os.getenv("CLOUDINARY_API_SECRET"),
 }
 
+# "local" keeps uploads and their resized variants under MEDIA_ROOT instead of Cloudinary.
+MEDIA_STORAGE = os.getenv(
+    "MEDIA_STORAGE", "cloudinary" if CLOUDINARY_STORAGE["CLOUD_NAME"] else "local"
+)
+MEDIA_STORAGE_BACKENDS = {
+    "cloudinary": "core.storage.CloudinaryMediaStorage",
+    "local": "core.storage.LocalMediaStorage",
+}
+
+# Threads that process uploaded images after commit; 0 processes them inline.
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))
+
 STORAGES = {
     "default": {
-        "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+        "BACKEND": MEDIA_STORAGE_BACKENDS[MEDIA_STORAGE],
     },
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
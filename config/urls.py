@@ -32,6 +32,7 @@ urlpatterns = [
 if settings.DEBUG:
     # Legacy local uploads fallback: old cover files were saved under BASE_DIR/games/covers.
     urlpatterns += static("/games/covers/", document_root=Path(settings.BASE_DIR) / "games" / "covers")
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 handler404 = lambda request, exception: page_not_found(  # noqa: E731
     request, exception, template_name="errors/404.html"
@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.apps import apps
+        from django.core.checks import register
+        from django.db.models.signals import post_save, pre_save
+
+        from . import checks, signals
+
+        register(checks.check_cache_backend, deploy=True)
+
+        for label in signals.MEDIA_FIELDS:
+            model = apps.get_model(label)
+            pre_save.connect(
+                signals.remember_media_uploads,
+                sender=model,
+                dispatch_uid=f"core.media.{label}_saving",
+            )
+            post_save.connect(
+                signals.process_media_uploads,
+                sender=model,
+                dispatch_uid=f"core.media.{label}_saved",
+            )
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Warning
+
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def check_cache_backend(app_configs, **kwargs):
+    if settings.CACHES["default"]["BACKEND"] not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "Catalog, role and order counters are bumped in the cache; other workers "
+                "and management commands will not see those bumps. Set REDIS_URL unless "
+                "a single process serves the site."
+            ),
+            id="core.W001",
+        )
+    ]
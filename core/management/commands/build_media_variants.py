@@ -0,0 +1,30 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.signals import MEDIA_FIELDS
+from core.utils.images import IMAGE_ERRORS, image_processed, mark_image_failed, process_image
+
+
+class Command(BaseCommand):
+    help = "Process stored images: resized WebP/JPEG variants, placeholders and dimensions."
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        for label, fields in MEDIA_FIELDS.items():
+            model = apps.get_model(label)
+            for instance in model.objects.iterator():
+                for name in fields:
+                    file = getattr(instance, name)
+                    if not file:
+                        continue
+                    try:
+                        process_image(file)
+                    except IMAGE_ERRORS as exc:
+                        mark_image_failed(file)
+                        failed += 1
+                        self.stderr.write(f"{label} #{instance.pk} {name}: {exc}")
+                        continue
+                    processed += 1
+                    image_processed.send(sender=model, instance=instance, field=name)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} images ({failed} failed)."))
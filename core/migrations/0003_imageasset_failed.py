@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_imageasset"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imageasset",
+            name="failed",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -20,3 +20,15 @@ class News(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class ImageAsset(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    placeholder = models.TextField(blank=True)
+    failed = models.BooleanField(default=False)
+    processed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,30 @@
+from .utils.images import queue_image_processing
+
+MEDIA_FIELDS = {
+    "accounts.profile": ("avatar",),
+    "catalog.game": ("cover",),
+    "catalog.screenshot": ("image",),
+    "core.news": ("image",),
+}
+
+
+def _media_fields(sender):
+    return MEDIA_FIELDS.get(sender._meta.label_lower, ())
+
+
+def remember_media_uploads(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Uncommitted files are new uploads; the field commits them right after this signal.
+    instance._media_uploads = [
+        name
+        for name in _media_fields(sender)
+        if getattr(instance, name) and not getattr(instance, name)._committed
+    ]
+
+
+def process_media_uploads(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for name in instance.__dict__.pop("_media_uploads", ()):
+        queue_image_processing(instance, name)
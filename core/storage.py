@@ -0,0 +1,54 @@
+import os
+
+import cloudinary
+import cloudinary.uploader
+from cloudinary_storage.storage import MediaCloudinaryStorage
+from django.core.files.storage import FileSystemStorage
+
+FILE_EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+
+
+class CloudinaryMediaStorage(MediaCloudinaryStorage):
+    # Cloudinary resizes and strips metadata on delivery, so variants are URLs only.
+    def variant_url(self, name, variant, width, image_format):
+        name = self._prepend_prefix(name)
+        resource = cloudinary.CloudinaryResource(
+            name, default_resource_type=self._get_resource_type(name)
+        )
+        return resource.build_url(
+            width=width, crop="limit", quality="auto", fetch_format=FILE_EXTENSIONS[image_format]
+        )
+
+    def replace_original(self, name, content):
+        cloudinary.uploader.upload(
+            content,
+            public_id=self._prepend_prefix(name),
+            overwrite=True,
+            invalidate=True,
+            resource_type=self._get_resource_type(name),
+            tags=self.TAG,
+        )
+        return name
+
+
+class LocalMediaStorage(FileSystemStorage):
+    # Filesystem stand-in for Cloudinary: variants are written next to the originals.
+    def variant_name(self, name, variant, image_format):
+        stem = os.path.splitext(name)[0]
+        return f"variants/{variant}/{stem}.{FILE_EXTENSIONS[image_format]}"
+
+    def save_variant(self, name, variant, image_format, content):
+        variant_name = self.variant_name(name, variant, image_format)
+        if self.exists(variant_name):
+            self.delete(variant_name)
+        return self.save(variant_name, content)
+
+    def replace_original(self, name, content):
+        self.delete(name)
+        return self.save(name, content)
+
+    def variant_url(self, name, variant, width, image_format):
+        variant_name = self.variant_name(name, variant, image_format)
+        if self.exists(variant_name):
+            return self.url(variant_name)
+        return self.url(name)
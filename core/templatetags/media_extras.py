@@ -0,0 +1,20 @@
+from django import template
+
+from core.utils.media import image_url, image_urls
+
+register = template.Library()
+
+
+@register.filter
+def media_url(file, variant="url"):
+    return image_url(file, variant)
+
+
+@register.filter
+def media_urls(file):
+    return image_urls(file)
+
+
+@register.filter
+def media_variant(urls, variant):
+    return urls.get(variant or "card", "")
@@ -0,0 +1,37 @@
+import threading
+
+from django.db import connection, connections
+
+
+class ConcurrencyMixin:
+    workers = 6
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("threads need a file-backed test database on SQLite")
+
+    def run_in_parallel(self, target, args):
+        # Starts one thread per argument behind a barrier and returns the results in order.
+        barrier = threading.Barrier(len(args))
+        results = [None] * len(args)
+        errors = []
+
+        def worker(index, arg):
+            try:
+                barrier.wait()
+                results[index] = target(arg)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(index, arg)) for index, arg in enumerate(args)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from catalog.models import Game
+from core.models import ImageAsset
+from core.utils import images
+from core.utils.media import image_urls
+
+STORAGES = {
+    "default": {"BACKEND": "core.storage.LocalMediaStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def jpeg_upload(name, size=(64, 32), exif=None):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="JPEG", exif=exif or b"")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(STORAGES=STORAGES, MEDIA_ROOT=media_root, MEDIA_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_game(self, title, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Game.objects.create(
+                title=title, description="x", price=Decimal("5.00"), release_year=2020, **fields
+            )
+
+    def test_decompression_bomb_is_marked_failed(self):
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            game = self.create_game("Bomb", cover=jpeg_upload("bomb.jpg"))
+        asset = ImageAsset.objects.get(name=game.cover.name)
+        self.assertTrue(asset.failed)
+        self.assertEqual(image_urls(Game.objects.get(pk=game.pk).cover), {})
+
+    def test_original_is_stored_without_exif(self):
+        exif = Image.Exif()
+        exif[0x010F] = "SecretCam"
+        exif[0x8825] = {1: "N", 2: (52.0, 22.0, 0.0)}
+        game = self.create_game("Camera", cover=jpeg_upload("gps.jpg", exif=exif.tobytes()))
+        cover = Game.objects.get(pk=game.pk).cover
+        with cover.storage.open(cover.name) as handle, Image.open(handle) as image:
+            self.assertEqual(image.size, (64, 32))
+            self.assertNotIn("exif", image.info)
+            self.assertEqual(len(image.getexif()), 0)
+        self.assertFalse(ImageAsset.objects.get(name=cover.name).failed)
+
+    def test_admin_changelist_prefetches_image_urls(self):
+        admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_login(admin)
+        url = reverse("admin:catalog_game_changelist")
+
+        def cold_changelist():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(queries)
+
+        self.create_game("First", cover=jpeg_upload("first.jpg"))
+        baseline = cold_changelist()
+        for index in range(4):
+            self.create_game(f"Game {index}", cover=jpeg_upload(f"game-{index}.jpg"))
+        self.assertEqual(cold_changelist(), baseline)
+
+    def test_worker_failures_are_logged(self):
+        job = ("catalog.game", 1, "cover", "games/covers/missing.jpg")
+        with mock.patch.object(images, "_process_upload", side_effect=RuntimeError("storage")):
+            with self.assertLogs("core.utils.images", "ERROR") as logs:
+                images._process_in_worker(*job)
+        self.assertIn("games/covers/missing.jpg", logs.output[0])
+        self.assertIn("RuntimeError: storage", logs.output[0])
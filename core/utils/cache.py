@@ -0,0 +1,73 @@
+import math
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY_PREFIX = "version"
+LOOKUP_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(namespace):
+    return f"{VERSION_KEY_PREFIX}:{namespace}"
+
+
+def _changed_at_key(namespace):
+    return f"{VERSION_KEY_PREFIX}:{namespace}:changed_at"
+
+
+def _fresh_version():
+    # Millisecond clock seed so an evicted counter never repeats an older version.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_changed_at(namespace):
+    # Whole seconds rounded up, matching HTTP date precision; an unknown time counts as now.
+    key = _changed_at_key(namespace)
+    timestamp = cache.get(key)
+    if timestamp is None:
+        cache.add(key, math.ceil(time.time()), None)
+        timestamp = cache.get(key)
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def bump_version(namespace):
+    key = _version_key(namespace)
+    cache.set(_changed_at_key(namespace), math.ceil(time.time()), None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _fresh_version()
+        cache.set(key, version, None)
+        return version
+
+
+def bump_version_on_commit(namespace):
+    # Bump now for readers inside this transaction and again after commit so other
+    # processes cannot cache pre-commit data under the new version.
+    bump_version(namespace)
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def versioned_key(namespace, *parts):
+    suffix = ":".join(str(part) for part in parts)
+    return f"{namespace}:v{get_version(namespace)}:{suffix}"
+
+
+def cached_lookup(namespace, model, timeout=LOOKUP_CACHE_TIMEOUT):
+    key = versioned_key(namespace, "lookup", model._meta.label_lower)
+    items = cache.get(key)
+    if items is None:
+        items = list(model.objects.order_by("name").values("id", "name", "slug"))
+        cache.set(key, items, timeout)
+    return items
@@ -0,0 +1,158 @@
+import base64
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageFilter, ImageOps
+
+from core.models import ImageAsset
+
+from .media import IMAGE_FORMATS, IMAGE_VARIANTS, refresh_image_urls
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_SIZE = 16
+ENCODE_OPTIONS = {
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "png": {"format": "PNG", "optimize": True},
+}
+# Stored originals in these formats are re-encoded without metadata; quality stays near lossless.
+ORIGINAL_FORMATS = {"JPEG": "jpeg", "WEBP": "webp", "PNG": "png"}
+ORIGINAL_QUALITY = 95
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment")
+# Oversized (decompression bomb) and unreadable uploads are recorded as failed assets.
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+# Sent with the refreshed instance once an upload's variants and metadata are stored.
+image_processed = Signal()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def load_image(file):
+    with file.storage.open(file.name, "rb") as handle:
+        image = Image.open(handle)
+        source_format = image.format
+        has_metadata = any(key in image.info for key in METADATA_KEYS)
+        # Apply the EXIF orientation before re-encoding drops the metadata.
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB"), source_format, has_metadata
+
+
+def encode_image(image, image_format, **options):
+    if image_format == "jpeg" and image.mode == "RGBA":
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    buffer = BytesIO()
+    # No exif/icc arguments are passed, so the encoded variants carry no metadata.
+    image.save(buffer, **{**ENCODE_OPTIONS[image_format], **options})
+    return buffer.getvalue()
+
+
+def build_placeholder(image):
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    data = encode_image(tiny, "jpeg", quality=40, progressive=False)
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+
+def strip_original(file, image, source_format):
+    image_format = ORIGINAL_FORMATS.get(source_format)
+    if image_format is None or not hasattr(file.storage, "replace_original"):
+        return
+    options = {} if image_format == "png" else {"quality": ORIGINAL_QUALITY}
+    content = ContentFile(encode_image(image, image_format, **options))
+    file.storage.replace_original(file.name, content)
+
+
+def process_image(file):
+    image, source_format, has_metadata = load_image(file)
+    storage = file.storage
+    if has_metadata:
+        # The upload is stored as sent; its EXIF can carry GPS positions and camera serials.
+        strip_original(file, image, source_format)
+    if hasattr(storage, "save_variant"):
+        for variant, width in IMAGE_VARIANTS:
+            resized = image.copy()
+            resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+            for image_format in IMAGE_FORMATS:
+                content = ContentFile(encode_image(resized, image_format))
+                storage.save_variant(file.name, variant, image_format, content)
+    ImageAsset.objects.update_or_create(
+        name=file.name,
+        defaults={
+            "width": image.width,
+            "height": image.height,
+            "placeholder": build_placeholder(image),
+            "failed": False,
+        },
+    )
+    return refresh_image_urls(file)
+
+
+def mark_image_failed(file):
+    ImageAsset.objects.update_or_create(
+        name=file.name, defaults={"width": 0, "height": 0, "placeholder": "", "failed": True}
+    )
+    return refresh_image_urls(file)
+
+
+def _process_upload(label, pk, field_name, name):
+    model = apps.get_model(label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+    file = getattr(instance, field_name)
+    # A newer upload replaced this one and queued its own job.
+    if file.name != name:
+        return
+    try:
+        process_image(file)
+    except IMAGE_ERRORS:
+        mark_image_failed(file)
+    image_processed.send(sender=model, instance=instance, field=field_name)
+
+
+def _process_in_worker(*job):
+    try:
+        _process_upload(*job)
+    except Exception:
+        # Nothing waits on the future, so anything else (storage, network) is logged here.
+        logger.exception("Image processing failed for %s #%s %s (%s)", *job)
+    finally:
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.MEDIA_WORKERS, thread_name_prefix="media"
+            )
+        return _executor
+
+
+def _submit(job):
+    if settings.MEDIA_WORKERS > 0:
+        _get_executor().submit(_process_in_worker, *job)
+    else:
+        _process_upload(*job)
+
+
+def queue_image_processing(instance, field_name):
+    file = getattr(instance, field_name)
+    job = (instance._meta.label_lower, instance.pk, field_name, file.name)
+    transaction.on_commit(lambda: _submit(job))
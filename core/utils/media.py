@@ -0,0 +1,104 @@
+import hashlib
+
+from django.core.cache import cache
+
+from core.models import ImageAsset
+
+MEDIA_URL_TIMEOUT = 60 * 60 * 24 * 7
+IMAGE_VARIANTS = (
+    ("thumbnail", 160),
+    ("card", 480),
+    ("hero", 1280),
+)
+# JPEG is the fallback every browser takes; WebP is offered through <picture>.
+IMAGE_FORMATS = ("webp", "jpeg")
+
+
+def _media_key(file):
+    digest = hashlib.md5(file.name.encode("utf-8")).hexdigest()
+    return f"media:{type(file.storage).__name__}:{digest}"
+
+
+def _srcset(urls, image_format):
+    return ", ".join(
+        f"{urls[image_format][variant]} {width}w" for variant, width in IMAGE_VARIANTS
+    )
+
+
+def compute_image_urls(file, asset=None):
+    if asset and asset["failed"]:
+        # Images that could not be decoded (or are decompression bombs) are not served at all.
+        return {}
+    storage = file.storage
+    original = storage.url(file.name)
+    variant_url = getattr(storage, "variant_url", None)
+    formats = {
+        image_format: {
+            variant: (
+                variant_url(file.name, variant, width, image_format) if variant_url else original
+            )
+            for variant, width in IMAGE_VARIANTS
+        }
+        for image_format in IMAGE_FORMATS
+    }
+    urls = {"url": original, **formats["jpeg"]}
+    urls["srcset"] = _srcset(formats, "jpeg")
+    urls["webp_srcset"] = _srcset(formats, "webp")
+    urls["width"] = asset["width"] if asset else None
+    urls["height"] = asset["height"] if asset else None
+    urls["placeholder"] = asset["placeholder"] if asset else ""
+    return urls
+
+
+def _image_assets(names):
+    rows = ImageAsset.objects.filter(name__in=names).values(
+        "name", "width", "height", "placeholder", "failed"
+    )
+    return {row["name"]: row for row in rows}
+
+
+def _resolve(file, urls, asset=None):
+    if urls is None:
+        try:
+            urls = compute_image_urls(file, asset)
+        except Exception:
+            urls = {}
+        else:
+            cache.set(_media_key(file), urls, MEDIA_URL_TIMEOUT)
+    file._media_urls = urls
+    return urls
+
+
+def image_urls(file):
+    if not file:
+        return {}
+    urls = getattr(file, "_media_urls", None)
+    if urls is not None:
+        return urls
+    urls = cache.get(_media_key(file))
+    if urls is None:
+        return _resolve(file, None, _image_assets([file.name]).get(file.name))
+    return _resolve(file, urls)
+
+
+def image_url(file, variant="url"):
+    return image_urls(file).get(variant, "")
+
+
+def prefetch_image_urls(files):
+    pending = [file for file in files if file and getattr(file, "_media_urls", None) is None]
+    if not pending:
+        return
+    cached = cache.get_many({_media_key(file) for file in pending})
+    missing = [file.name for file in pending if _media_key(file) not in cached]
+    assets = _image_assets(missing) if missing else {}
+    for file in pending:
+        _resolve(file, cached.get(_media_key(file)), assets.get(file.name))
+
+
+def refresh_image_urls(file):
+    if not file:
+        return {}
+    cache.delete(_media_key(file))
+    file._media_urls = None
+    return image_urls(file)
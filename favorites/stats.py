@@ -0,0 +1,25 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from accounts.chrome import bump_chrome_version
+from accounts.models import Profile
+
+from .models import Favorite
+
+
+def apply_favorites_change(user_id, delta):
+    if not delta:
+        return
+    Profile.objects.filter(user_id=user_id).update(favorites_count=F("favorites_count") + delta)
+    bump_chrome_version(user_id)
+
+
+def rebuild_favorites_stats(queryset=None):
+    profiles_qs = queryset if queryset is not None else Profile.objects.all()
+    favorites = Favorite.objects.filter(user=OuterRef("user")).order_by().values("user")
+    favorites_count = Coalesce(
+        Subquery(favorites.annotate(total=Count("id")).values("total")[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    return profiles_qs.update(favorites_count=favorites_count)
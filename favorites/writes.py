@@ -0,0 +1,15 @@
+from django.db import transaction
+
+from .models import Favorite
+from .stats import apply_favorites_change
+
+
+def toggle_favorite(user, game):
+    with transaction.atomic():
+        deleted, _ = Favorite.objects.filter(user=user, game=game).delete()
+        if deleted:
+            apply_favorites_change(user.pk, -deleted)
+            return False
+        Favorite.objects.create(user=user, game=game)
+        apply_favorites_change(user.pk, 1)
+    return True
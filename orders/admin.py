@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Order, OrderItem, Payment
+from .models import Order, OrderItem, OrderStatusChange, Payment
 
 
 @admin.register(Order)
@@ -20,3 +20,10 @@ class OrderItemAdmin(admin.ModelAdmin):
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ("id", "order", "provider", "status", "paid_at")
     list_filter = ("status", "provider")
+
+
+@admin.register(OrderStatusChange)
+class OrderStatusChangeAdmin(admin.ModelAdmin):
+    list_display = ("id", "order", "from_status", "to_status", "changed_by", "changed_at")
+    list_filter = ("to_status", "changed_at")
+    search_fields = ("order__id", "changed_by__username")
@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "orders"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_init, post_save
+
+        from . import signals
+        from .models import Order
+
+        # Covers single saves and deletes from the admin; bulk transitions adjust the counts
+        # in transition_orders.
+        post_init.connect(
+            signals.remember_status, sender=Order, dispatch_uid="orders.remember_status"
+        )
+        post_save.connect(
+            signals.update_status_counts_on_save,
+            sender=Order,
+            dispatch_uid="orders.status_counts_saved",
+        )
+        post_delete.connect(
+            signals.update_status_counts_on_delete,
+            sender=Order,
+            dispatch_uid="orders.status_counts_deleted",
+        )
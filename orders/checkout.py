@@ -0,0 +1,58 @@
+from django.db import IntegrityError, transaction
+
+from cart.models import Cart, CartItem
+from cart.stats import reset_cart_stats
+
+from .models import Order, OrderItem, Payment
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+
+def place_order(user, idempotency_key):
+    try:
+        return _place_order(user, idempotency_key)
+    except IntegrityError:
+        # Another request committed the same key first; replay its order.
+        order = Order.objects.filter(user=user, idempotency_key=idempotency_key).first()
+        if order is None:
+            raise
+        return order, False
+
+
+def _place_order(user, idempotency_key):
+    # A fixed number of statements regardless of cart size: lock, replay check, read items,
+    # then one insert per table, one delete and one counter reset.
+    with transaction.atomic():
+        cart = Cart.objects.select_for_update().filter(user=user).first()
+        # Checked after the cart lock, so a request that waited sees the order just committed.
+        order = Order.objects.filter(user=user, idempotency_key=idempotency_key).first()
+        if order is not None:
+            return order, False
+        if cart is None:
+            return None, False
+
+        items = list(CartItem.objects.select_for_update().filter(cart=cart).order_by("pk"))
+        if not items:
+            return None, False
+
+        order = Order.objects.create(
+            user=user,
+            status=Order.Status.NEW,
+            total_price=sum(item.price_snapshot * item.quantity for item in items),
+            idempotency_key=idempotency_key,
+        )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    game_id=item.game_id,
+                    quantity=item.quantity,
+                    price_snapshot=item.price_snapshot,
+                )
+                for item in items
+            ]
+        )
+        Payment.objects.create(order=order, provider="demo", status=Payment.PaymentStatus.PENDING)
+        CartItem.objects.filter(cart=cart).delete()
+        reset_cart_stats(user.pk)
+    return order, True
@@ -0,0 +1,44 @@
+from django.db.models import Prefetch
+
+from catalog.pagination import keyset_paginate
+
+from .models import Order, OrderItem
+
+ORDERS_PER_PAGE = 10
+ORDER_HISTORY_SORT = ("created_at", True)
+
+
+def _items_prefetch():
+    items = OrderItem.objects.select_related("game").only(
+        "order", "quantity", "price_snapshot", "game__slug", "game__title"
+    )
+    return Prefetch("items", queryset=items.order_by("pk"))
+
+
+def order_history_page(user, cursor=None, page=None, per_page=ORDERS_PER_PAGE):
+    # Walks order_user_created_idx: one COUNT, one page of orders and one query for all their items.
+    orders = Order.objects.filter(user=user)
+    page_obj = keyset_paginate(
+        orders.prefetch_related(_items_prefetch()),
+        ORDER_HISTORY_SORT,
+        per_page,
+        cursor=cursor,
+        page=page,
+        total=orders.count(),
+    )
+    for order in page_obj.object_list:
+        order.item_count = sum(item.quantity for item in order.items.all())
+    return page_obj
+
+
+def order_with_items(user, order_id):
+    # Items and their order come back in one joined query; an order without items needs a second.
+    items = list(
+        OrderItem.objects.filter(order_id=order_id, order__user=user)
+        .select_related("order", "game")
+        .order_by("pk")
+    )
+    if items:
+        return items[0].order, items
+    order = Order.objects.filter(pk=order_id, user=user).first()
+    return order, []
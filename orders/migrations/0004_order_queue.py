@@ -0,0 +1,46 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_order_user_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderStatusChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("from_status", models.CharField(choices=[("new", "New"), ("paid", "Paid"), ("shipped", "Shipped"), ("canceled", "Canceled")], max_length=16)),
+                ("to_status", models.CharField(choices=[("new", "New"), ("paid", "Paid"), ("shipped", "Shipped"), ("canceled", "Canceled")], max_length=16)),
+                ("changed_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-changed_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["status", "created_at", "id"], name="order_status_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["created_at", "id"], name="order_created_idx"),
+        ),
+        migrations.AddField(
+            model_name="orderstatuschange",
+            name="changed_by",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="order_status_changes", to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name="orderstatuschange",
+            name="order",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="status_changes", to="orders.order"),
+        ),
+    ]
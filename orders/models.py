@@ -15,9 +15,20 @@ class Order(models.Model):
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.NEW)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    idempotency_key = models.CharField(max_length=64, blank=True, null=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"], name="order_user_idempotency_key_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="order_user_created_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="order_status_created_idx"),
+            models.Index(fields=["created_at", "id"], name="order_created_idx"),
+        ]
 
     def __str__(self):
         return f"Order #{self.pk} ({self.user})"
@@ -49,3 +60,23 @@ class Payment(models.Model):
 
     def __str__(self):
         return f"Payment for order #{self.order_id}"
+
+
+class OrderStatusChange(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="status_changes")
+    from_status = models.CharField(max_length=16, choices=Order.Status.choices)
+    to_status = models.CharField(max_length=16, choices=Order.Status.choices)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="order_status_changes",
+    )
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-changed_at"]
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status} -> {self.to_status}"
@@ -0,0 +1,123 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from catalog.pagination import keyset_paginate
+
+from .models import Order, OrderStatusChange
+
+ORDERS_QUEUE_PER_PAGE = 20
+ORDERS_BULK_MAX = 500
+ORDER_QUEUE_SORT = ("created_at", True)
+STATUS_COUNTS_TIMEOUT = 60 * 60
+
+
+def _status_count_key(status):
+    return f"orders:status_count:{status}"
+
+
+def status_counts():
+    keys = {status: _status_count_key(status) for status in Order.Status.values}
+    cached = cache.get_many(keys.values())
+    if len(cached) == len(keys):
+        return {status: cached[key] for status, key in keys.items()}
+    rows = dict(Order.objects.order_by().values_list("status").annotate(total=Count("id")))
+    counts = {status: rows.get(status, 0) for status in keys}
+    cache.set_many({keys[status]: total for status, total in counts.items()}, STATUS_COUNTS_TIMEOUT)
+    return counts
+
+
+def adjust_status_counts(deltas):
+    def apply():
+        for status, delta in deltas.items():
+            key = _status_count_key(status)
+            try:
+                if delta > 0:
+                    cache.incr(key, delta)
+                elif delta < 0:
+                    cache.decr(key, -delta)
+            except ValueError:
+                # Not cached yet; the next read recounts from the table.
+                pass
+
+    transaction.on_commit(apply)
+
+
+def reset_status_counts():
+    keys = [_status_count_key(status) for status in Order.Status.values]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _day_start(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def filter_orders(queryset, filters):
+    if filters.get("status"):
+        queryset = queryset.filter(status=filters["status"])
+    if filters.get("date_from"):
+        queryset = queryset.filter(created_at__gte=_day_start(filters["date_from"]))
+    if filters.get("date_to"):
+        date_to = filters["date_to"] + timedelta(days=1)
+        queryset = queryset.filter(created_at__lt=_day_start(date_to))
+    if filters.get("user"):
+        queryset = queryset.filter(user__username=filters["user"])
+    if filters.get("total_min") is not None:
+        queryset = queryset.filter(total_price__gte=filters["total_min"])
+    if filters.get("total_max") is not None:
+        queryset = queryset.filter(total_price__lte=filters["total_max"])
+    return queryset
+
+
+def queue_total(filters):
+    # Known from the cached status counts when only the status is filtered, unknown otherwise.
+    if any(value not in (None, "") for name, value in filters.items() if name != "status"):
+        return None
+    counts = status_counts()
+    return counts[filters["status"]] if filters.get("status") else sum(counts.values())
+
+
+def order_queue_page(filters, cursor=None, per_page=ORDERS_QUEUE_PER_PAGE):
+    queryset = filter_orders(
+        Order.objects.select_related("user").only(
+            "status", "total_price", "created_at", "user", "user__username"
+        ),
+        filters,
+    )
+    # Navigation is cursor only, so no COUNT runs for filtered views.
+    total = queue_total(filters)
+    page_obj = keyset_paginate(
+        queryset, ORDER_QUEUE_SORT, per_page, cursor=cursor, total=total or 0
+    )
+    return page_obj, total
+
+
+def transition_orders(order_ids, status, changed_by=None):
+    with transaction.atomic():
+        rows = list(
+            Order.objects.select_for_update()
+            .filter(pk__in=order_ids)
+            .exclude(status=status)
+            .values_list("pk", "status")
+        )
+        if not rows:
+            return 0
+        Order.objects.filter(pk__in=[pk for pk, _ in rows]).update(status=status)
+        OrderStatusChange.objects.bulk_create(
+            [
+                OrderStatusChange(
+                    order_id=pk, from_status=old_status, to_status=status, changed_by=changed_by
+                )
+                for pk, old_status in rows
+            ]
+        )
+        deltas = Counter()
+        for _, old_status in rows:
+            deltas[old_status] -= 1
+        deltas[status] += len(rows)
+        adjust_status_counts(deltas)
+    return len(rows)
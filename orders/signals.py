@@ -0,0 +1,24 @@
+from .queue import adjust_status_counts, reset_status_counts
+
+
+def remember_status(sender, instance, **kwargs):
+    instance._counted_status = instance.__dict__.get("status") if instance.pk else None
+
+
+def update_status_counts_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = getattr(instance, "_counted_status", None)
+    if created:
+        adjust_status_counts({instance.status: 1})
+    elif old_status is None:
+        # Loaded without its status, so the old one is unknown; recount on the next read.
+        reset_status_counts()
+    elif old_status != instance.status:
+        adjust_status_counts({old_status: -1, instance.status: 1})
+    instance._counted_status = instance.status
+
+
+def update_status_counts_on_delete(sender, instance, **kwargs):
+    status = getattr(instance, "_counted_status", None) or instance.status
+    adjust_status_counts({status: -1})
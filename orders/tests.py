@@ -0,0 +1,174 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cart.models import Cart, CartItem
+from catalog.models import Game
+from core.testing import ConcurrencyMixin
+from orders.checkout import place_order
+from orders.models import Order, OrderItem, OrderStatusChange, Payment
+from orders.queue import status_counts, transition_orders
+
+
+def create_cart(user, size):
+    cart, _ = Cart.objects.get_or_create(user=user)
+    for index in range(size):
+        game = Game.objects.create(
+            title=f"Game {user.pk}-{index}",
+            description="x",
+            price=Decimal("10.00"),
+            release_year=2020,
+        )
+        CartItem.objects.create(cart=cart, game=game, quantity=2, price_snapshot=game.price)
+    return cart
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("buyer", password="secret")
+
+    def test_replayed_key_returns_existing_order(self):
+        create_cart(self.user, 3)
+        order, created = place_order(self.user, "key-1")
+        self.assertTrue(created)
+        self.assertEqual(order.total_price, Decimal("60.00"))
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 3)
+        self.assertTrue(Payment.objects.filter(order=order).exists())
+        self.assertFalse(CartItem.objects.filter(cart__user=self.user).exists())
+
+        create_cart(self.user, 1)
+        replayed, created = place_order(self.user, "key-1")
+        self.assertFalse(created)
+        self.assertEqual(replayed.pk, order.pk)
+        self.assertEqual(CartItem.objects.filter(cart__user=self.user).count(), 1)
+
+    def test_empty_cart_places_nothing(self):
+        self.assertEqual(place_order(self.user, "key-1"), (None, False))
+        Cart.objects.create(user=self.user)
+        self.assertEqual(place_order(self.user, "key-1"), (None, False))
+        self.assertFalse(Order.objects.exists())
+
+    def test_statement_count_does_not_grow_with_cart_size(self):
+        counts = []
+        for size, key in ((1, "small"), (25, "large")):
+            create_cart(self.user, size)
+            with CaptureQueriesContext(connection) as queries:
+                place_order(self.user, key)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_double_submitted_form_creates_one_order(self):
+        create_cart(self.user, 2)
+        self.client.force_login(self.user)
+        form = {"idempotency_key": "form-key"}
+        first = self.client.post(reverse("pages:checkout"), form)
+        second = self.client.post(reverse("pages:checkout"), form)
+        self.assertEqual(first.url, second.url)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class OrderStatusCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("buyer", password="secret")
+        self.orders = [
+            Order.objects.create(user=self.user, total_price=Decimal("10.00")) for _ in range(4)
+        ]
+
+    def assertCountsMatchTable(self, expected):
+        cached = status_counts()
+        cache.clear()
+        self.assertEqual(cached, status_counts())
+        self.assertEqual(cached, expected)
+
+    def test_counts_follow_checkout(self):
+        self.assertEqual(status_counts()["new"], 4)
+        create_cart(self.user, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(self.user, "key-1")
+        self.assertCountsMatchTable({"new": 5, "paid": 0, "shipped": 0, "canceled": 0})
+
+    def test_bulk_transition_moves_counts(self):
+        staff = User.objects.create_user("staff", password="secret", is_staff=True)
+        status_counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = transition_orders([order.pk for order in self.orders[:3]], "paid", staff)
+        self.assertEqual(changed, 3)
+        self.assertCountsMatchTable({"new": 1, "paid": 3, "shipped": 0, "canceled": 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = transition_orders([order.pk for order in self.orders], "paid", staff)
+        self.assertEqual(changed, 1)
+        self.assertEqual(OrderStatusChange.objects.filter(to_status="paid").count(), 4)
+        self.assertEqual(OrderStatusChange.objects.filter(changed_by=staff).count(), 4)
+        self.assertCountsMatchTable({"new": 0, "paid": 4, "shipped": 0, "canceled": 0})
+
+    def test_single_saves_and_deletes_move_counts(self):
+        status_counts()
+        order = Order.objects.get(pk=self.orders[0].pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = Order.Status.SHIPPED
+            order.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.get(pk=self.orders[1].pk).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(pk=self.orders[2].pk).delete()
+        self.assertCountsMatchTable({"new": 1, "paid": 0, "shipped": 1, "canceled": 0})
+
+    def test_saving_an_order_loaded_without_its_status_recounts(self):
+        status_counts()
+        order = Order.objects.only("total_price").get(pk=self.orders[0].pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = Order.Status.CANCELED
+            order.save()
+        self.assertCountsMatchTable({"new": 3, "paid": 0, "shipped": 0, "canceled": 1})
+
+    def test_admin_status_edit_moves_counts(self):
+        admin = User.objects.create_superuser("admin", password="secret")
+        self.client.force_login(admin)
+        order = self.orders[0]
+        status_counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin:orders_order_change", args=[order.pk]),
+                {"user": self.user.pk, "status": "paid", "total_price": "10.00"},
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertCountsMatchTable({"new": 3, "paid": 1, "shipped": 0, "canceled": 0})
+
+
+class ConcurrentCheckoutTests(ConcurrencyMixin, TransactionTestCase):
+    def test_parallel_replays_create_one_order(self):
+        user = User.objects.create_user("buyer", password="secret")
+        create_cart(user, 5)
+
+        results = self.run_in_parallel(
+            lambda key: place_order(User.objects.get(pk=user.pk), key), ["same"] * self.workers
+        )
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(OrderItem.objects.count(), 5)
+        self.assertEqual(Payment.objects.count(), 1)
+        self.assertEqual({order.pk for order, _ in results}, {Order.objects.get().pk})
+        self.assertEqual(sum(created for _, created in results), 1)
+
+    def test_parallel_checkouts_with_distinct_keys_share_one_cart(self):
+        user = User.objects.create_user("buyer", password="secret")
+        create_cart(user, 5)
+
+        results = self.run_in_parallel(
+            lambda key: place_order(User.objects.get(pk=user.pk), key),
+            [f"tab-{index}" for index in range(self.workers)],
+        )
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(OrderItem.objects.count(), 5)
+        self.assertEqual(sum(order is not None for order, _ in results), 1)
+        self.assertFalse(CartItem.objects.exists())
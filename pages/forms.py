@@ -2,6 +2,8 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 
+from orders.models import Order
+
 
 class RegisterForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -16,3 +18,14 @@ class RegisterForm(UserCreationForm):
         if commit:
             user.save()
         return user
+
+
+class OrderQueueFilterForm(forms.Form):
+    status = forms.ChoiceField(
+        required=False, choices=[("", "All statuses"), *Order.Status.choices]
+    )
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+    user = forms.CharField(required=False, max_length=150)
+    total_min = forms.DecimalField(required=False, min_value=0, max_digits=10, decimal_places=2)
+    total_max = forms.DecimalField(required=False, min_value=0, max_digits=10, decimal_places=2)
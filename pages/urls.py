@@ -71,6 +71,9 @@ urlpatterns = [
     path("orders/<int:order_id>/", views.order_detail, name="order_detail"),
     path("favorites/", views.favorites_list, name="favorites_list"),
     path("manage/orders/", views.manage_orders, name="manage_orders"),
+    path(
+        "manage/orders/status/", views.manage_orders_bulk_status, name="manage_orders_bulk_status"
+    ),
     path("manage/orders/<int:order_id>/status/", views.manage_order_status, name="manage_order_status"),
     path("product/<slug:slug>/favorite/", views.toggle_favorite, name="toggle_favorite"),
     path("product/<slug:slug>/review/", views.upsert_review, name="upsert_review"),
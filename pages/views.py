@@ -1,4 +1,5 @@
-﻿from decimal import Decimal
+﻿import uuid
+from decimal import Decimal
 from pathlib import Path
 
 from django.contrib import messages
@@ -6,36 +7,53 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import Group
-from django.core.paginator import Paginator
-from django.db.models import Avg
-from django.http import HttpResponseForbidden, JsonResponse
+from django.core.cache import cache
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.safestring import mark_safe
 from django.views.decorators.http import require_POST
 
-from accounts.utils import is_manager
+from accounts.chrome import get_chrome_context
+from accounts.roles import is_manager
 from accounts.models import Profile
-from cart.models import Cart, CartItem
+from cart.anonymous import anonymous_cart_items, get_anonymous_cart, set_anonymous_quantity
+from cart.models import CartItem
+from cart.writes import add_to_cart, remove_from_cart, set_cart_quantity
+from catalog.cache import product_namespace
+from catalog.cards import attach_game_cards
 from catalog.models import Game
 from catalog.views import shop as catalog_shop
 from core.models import News
+from core.utils.cache import versioned_key
+from core.utils.media import prefetch_image_urls
 from favorites.models import Favorite
-from orders.models import Order, OrderItem, Payment
-from reviews.models import Review
-from .forms import RegisterForm
+from favorites.writes import toggle_favorite as save_favorite
+from orders.checkout import IDEMPOTENCY_KEY_MAX_LENGTH, place_order
+from orders.history import order_history_page, order_with_items
+from orders.queue import ORDERS_BULK_MAX, order_queue_page, status_counts, transition_orders
+from orders.models import Order
+from reviews.feed import review_page
+from reviews.writes import upsert_review as save_review
+from .forms import OrderQueueFilterForm, RegisterForm
 
 ALLOWED_AVATAR_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp"}
 ALLOWED_AVATAR_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 MAX_AVATAR_SIZE_BYTES = 3 * 1024 * 1024
+PRODUCT_PAGE_TIMEOUT = 60 * 10
 
 
 def home(request):
-    news_list = News.objects.order_by("-created_at")[:4]
+    news_list = list(News.objects.order_by("-created_at")[:4])
+    prefetch_image_urls(news.image for news in news_list)
     return render(request, "pages/home.html", {"news_list": news_list})
 
 
 def news_list(request):
-    items = News.objects.order_by("-created_at")
+    items = list(News.objects.order_by("-created_at"))
+    prefetch_image_urls(news.image for news in items)
     return render(request, "pages/news_list.html", {"news_list": items})
 
 
@@ -100,7 +118,11 @@ def shop(request):
 def profile_view(request):
     profile, _ = Profile.objects.get_or_create(
         user=request.user,
-        defaults={"display_name": request.user.username},
+        defaults={
+            "display_name": request.user.username,
+            # Callable, so the count only runs when the profile is first created.
+            "favorites_count": lambda: Favorite.objects.filter(user=request.user).count(),
+        },
     )
 
     if request.method == "POST":
@@ -125,67 +147,87 @@ def profile_view(request):
         messages.success(request, "Avatar updated.")
         return redirect("pages:profile")
 
-    favorites_count = Favorite.objects.filter(user=request.user).count()
-    cart_count = CartItem.objects.filter(cart__user=request.user).count()
+    chrome = get_chrome_context(request.user)
     return render(
         request,
         "profile.html",
         {
             "profile": profile,
-            "favorites_count": favorites_count,
-            "cart_count": cart_count,
+            "favorites_count": chrome["favorites_count"],
+            "cart_count": chrome["cart_count"],
         },
     )
 
 
-def product_detail(request, slug):
-    game = get_object_or_404(
-        Game.objects.select_related("publisher", "developer", "system_requirement").prefetch_related(
-            "platforms",
-            "tags",
-            "screenshots",
-        ),
-        slug=slug,
-    )
-    reviews = Review.objects.filter(game=game).select_related("user").order_by("-created_at")
-    avg_rating = reviews.aggregate(Avg("rating"))["rating__avg"] or 0
-    reviews_count = reviews.count()
+def _product_page_slug_key(slug):
+    return f"product:slug:{slug}"
 
-    is_favorite = False
-    user_review = None
-    if request.user.is_authenticated:
-        is_favorite = Favorite.objects.filter(user=request.user, game=game).exists()
-        user_review = reviews.filter(user=request.user).first()
+
+def _render_product_page(slug, key=None):
+    game = (
+        Game.objects.select_related("publisher", "developer", "system_requirement")
+        .prefetch_related("platforms", "tags", "screenshots")
+        .filter(slug=slug)
+        .first()
+    )
+    if game is None:
+        return None
+    if key is None:
+        key = versioned_key(product_namespace(game.pk), "page")
+    prefetch_image_urls(
+        [game.primary_image, game.cover, *(shot.image for shot in game.screenshots.all())]
+    )
 
     try:
         system_requirement = game.system_requirement
     except Exception:
         system_requirement = None
 
-    return render(
-        request,
-        "pages/product_detail.html",
+    html = render_to_string(
+        "pages/product_detail_body.html",
         {
             "game": game,
-            "reviews": reviews,
-            "avg_rating": avg_rating,
-            "reviews_count": reviews_count,
-            "is_favorite": is_favorite,
-            "user_review": user_review,
+            "reviews": review_page(game),
+            "avg_rating": game.average_rating,
+            "reviews_count": game.reviews_count,
+            "rating_histogram": game.rating_histogram,
             "system_requirement": system_requirement,
         },
     )
+    page = {"slug": game.slug, "title": game.title, "html": mark_safe(html)}
+    cache.set(_product_page_slug_key(slug), game.pk, PRODUCT_PAGE_TIMEOUT)
+    cache.set(key, page, PRODUCT_PAGE_TIMEOUT)
+    return page
+
+
+def _product_page(slug):
+    # The body is the same for every visitor; per-user state comes from the overlay endpoint.
+    game_id = cache.get(_product_page_slug_key(slug))
+    if game_id is None:
+        return _render_product_page(slug)
+    # Take the key before reading the game so a concurrent change cannot be cached as current.
+    key = versioned_key(product_namespace(game_id), "page")
+    page = cache.get(key)
+    if page is not None and page["slug"] == slug:
+        return page
+    return _render_product_page(slug, key)
+
+
+def product_detail(request, slug):
+    page = _product_page(slug)
+    if page is None:
+        raise Http404("Game not found")
+    # The cached forms carry no token, so make sure the CSRF cookie is set for the overlay.
+    get_token(request)
+    return render(request, "pages/product_detail.html", {"page": page})
 
 
 @login_required
 def favorites_list(request):
-    favorites = (
-        Favorite.objects.filter(user=request.user)
-        .select_related("game")
-        .prefetch_related("game__screenshots")
-        .annotate(average_rating=Avg("game__reviews__rating"))
-        .order_by("-created_at")
+    favorites = list(
+        Favorite.objects.filter(user=request.user).select_related("game").order_by("-created_at")
     )
+    attach_game_cards([favorite.game for favorite in favorites], "components/favorite_card.html")
     return render(request, "favorites.html", {"favorites": favorites})
 
 
@@ -197,13 +239,7 @@ def toggle_favorite(request, slug):
         return redirect(f"{reverse('pages:login')}?next={request.path}")
 
     game = get_object_or_404(Game, slug=slug)
-    favorite = Favorite.objects.filter(user=request.user, game=game).first()
-    if favorite:
-        favorite.delete()
-        status = "removed"
-    else:
-        Favorite.objects.create(user=request.user, game=game)
-        status = "added"
+    status = "added" if save_favorite(request.user, game) else "removed"
 
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
         return JsonResponse({"status": status})
@@ -226,23 +262,15 @@ def upsert_review(request, slug):
     if rating < 1 or rating > 5:
         return redirect("pages:product_detail", slug=game.slug)
 
-    review, created = Review.objects.get_or_create(
-        user=request.user,
-        game=game,
-        defaults={"rating": rating, "text": text},
-    )
-    if not created:
-        review.rating = rating
-        review.text = text
-        review.save(update_fields=["rating", "text"])
-
+    save_review(request.user, game, rating, text)
     return redirect("pages:product_detail", slug=game.slug)
 
 
-@login_required
 def cart_detail(request):
-    cart, _ = Cart.objects.get_or_create(user=request.user)
-    items = list(CartItem.objects.filter(cart=cart).select_related("game"))
+    if request.user.is_authenticated:
+        items = list(CartItem.objects.filter(cart__user=request.user).select_related("game"))
+    else:
+        items = anonymous_cart_items(request)
     total_price = Decimal("0")
     for item in items:
         item.subtotal = item.price_snapshot * item.quantity
@@ -251,25 +279,19 @@ def cart_detail(request):
         request,
         "pages/cart.html",
         {
-            "cart": cart,
             "items": items,
             "total_price": total_price,
         },
     )
 
 
-@login_required
 def cart_add(request, slug):
     game = get_object_or_404(Game, slug=slug, is_active=True)
-    cart, _ = Cart.objects.get_or_create(user=request.user)
-    item, created = CartItem.objects.get_or_create(
-        cart=cart,
-        game=game,
-        defaults={"quantity": 1, "price_snapshot": game.price},
-    )
-    if not created:
-        item.quantity += 1
-        item.save(update_fields=["quantity"])
+    if request.user.is_authenticated:
+        add_to_cart(request.user, game)
+    else:
+        quantity = get_anonymous_cart(request).get(game.slug, 0) + 1
+        set_anonymous_quantity(request, game.slug, quantity)
 
     referer = request.META.get("HTTP_REFERER")
     if referer:
@@ -277,86 +299,74 @@ def cart_add(request, slug):
     return redirect("pages:cart_detail")
 
 
-@login_required
 @require_POST
 def cart_update(request, slug):
-    game = get_object_or_404(Game, slug=slug)
-    cart, _ = Cart.objects.get_or_create(user=request.user)
-    item = CartItem.objects.filter(cart=cart, game=game).first()
-    if not item:
-        return redirect("pages:cart_detail")
-
     quantity_raw = request.POST.get("quantity", "").strip()
     try:
         quantity = int(quantity_raw)
     except (TypeError, ValueError):
         return redirect("pages:cart_detail")
 
-    if quantity <= 0:
-        item.delete()
-    else:
-        item.quantity = quantity
-        item.save(update_fields=["quantity"])
+    if not request.user.is_authenticated:
+        if slug in get_anonymous_cart(request):
+            set_anonymous_quantity(request, slug, quantity)
+        return redirect("pages:cart_detail")
+
+    set_cart_quantity(request.user, slug, quantity)
     return redirect("pages:cart_detail")
 
 
-@login_required
 def cart_remove(request, slug):
-    game = get_object_or_404(Game, slug=slug)
-    cart, _ = Cart.objects.get_or_create(user=request.user)
-    CartItem.objects.filter(cart=cart, game=game).delete()
+    if request.user.is_authenticated:
+        remove_from_cart(request.user, slug)
+    else:
+        set_anonymous_quantity(request, slug, 0)
     return redirect("pages:cart_detail")
 
 
 @login_required
 def checkout(request):
-    cart, _ = Cart.objects.get_or_create(user=request.user)
-    items = list(CartItem.objects.filter(cart=cart).select_related("game"))
+    if request.method == "POST":
+        idempotency_key = request.POST.get("idempotency_key", "").strip()
+        idempotency_key = idempotency_key[:IDEMPOTENCY_KEY_MAX_LENGTH] or uuid.uuid4().hex
+        order, _ = place_order(request.user, idempotency_key)
+        if order is not None:
+            return redirect("pages:order_detail", order_id=order.id)
+
+    items = list(CartItem.objects.filter(cart__user=request.user).select_related("game"))
     total_price = Decimal("0")
     for item in items:
         item.subtotal = item.price_snapshot * item.quantity
         total_price += item.subtotal
 
-    if request.method == "POST" and items:
-        order = Order.objects.create(
-            user=request.user,
-            status=Order.Status.NEW,
-            total_price=total_price,
-        )
-        order_items = [
-            OrderItem(
-                order=order,
-                game=item.game,
-                quantity=item.quantity,
-                price_snapshot=item.price_snapshot,
-            )
-            for item in items
-        ]
-        OrderItem.objects.bulk_create(order_items)
-        Payment.objects.create(order=order, provider="demo", status=Payment.PaymentStatus.PENDING)
-        CartItem.objects.filter(cart=cart).delete()
-        return redirect("pages:order_detail", order_id=order.id)
-
     return render(
         request,
         "pages/checkout.html",
         {
             "items": items,
             "total_price": total_price,
+            "idempotency_key": uuid.uuid4().hex,
         },
     )
 
 
 @login_required
 def orders_list(request):
-    orders = Order.objects.filter(user=request.user).order_by("-created_at")
-    return render(request, "pages/orders_list.html", {"orders": orders})
+    orders = order_history_page(
+        request.user, cursor=request.GET.get("cursor"), page=request.GET.get("page")
+    )
+    return render(
+        request,
+        "pages/orders_list.html",
+        {"orders": orders, "page_range": orders.elided_page_range()},
+    )
 
 
 @login_required
 def order_detail(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
-    items = OrderItem.objects.filter(order=order).select_related("game")
+    order, items = order_with_items(request.user, order_id)
+    if order is None:
+        raise Http404("Order not found")
     return render(
         request,
         "pages/order_detail.html",
@@ -372,49 +382,78 @@ def manage_orders(request):
     if not is_manager(request.user):
         return HttpResponseForbidden("Forbidden")
 
-    status = request.GET.get("status", "").strip()
-    orders_qs = Order.objects.select_related("user").order_by("-created_at")
-    valid_statuses = {choice for choice, _ in Order.Status.choices}
-    if status in valid_statuses:
-        orders_qs = orders_qs.filter(status=status)
-
-    paginator = Paginator(orders_qs, 20)
-    orders = paginator.get_page(request.GET.get("page"))
+    form = OrderQueueFilterForm(request.GET)
+    form.is_valid()
+    filters = form.cleaned_data
+    orders, total = order_queue_page(filters, cursor=request.GET.get("cursor"))
+    counts = status_counts()
 
     query_params = request.GET.copy()
-    if "page" in query_params:
-        query_params.pop("page")
+    if "cursor" in query_params:
+        query_params.pop("cursor")
     query_string = query_params.urlencode()
 
     return render(
         request,
         "pages/manage_orders.html",
         {
+            "form": form,
             "orders": orders,
+            "total": total,
             "statuses": Order.Status.choices,
-            "current_status": status,
+            "status_counts": [
+                (value, label, counts[value]) for value, label in Order.Status.choices
+            ],
+            "current_status": filters.get("status", ""),
             "query_string": query_string,
         },
     )
 
 
+def _manage_orders_redirect(request):
+    url = reverse("pages:manage_orders")
+    query_string = request.POST.get("query_string", "").strip()
+    return redirect(f"{url}?{query_string}" if query_string else url)
+
+
 @login_required
 @require_POST
 def manage_order_status(request, order_id):
     if not is_manager(request.user):
         return HttpResponseForbidden("Forbidden")
 
-    order = get_object_or_404(Order, id=order_id)
+    order = get_object_or_404(Order.objects.only("id"), id=order_id)
     new_status = request.POST.get("status", "").strip()
     valid_statuses = {choice for choice, _ in Order.Status.choices}
     if new_status in valid_statuses:
-        order.status = new_status
-        order.save(update_fields=["status"])
+        transition_orders([order.pk], new_status, changed_by=request.user)
         messages.success(request, "Order status has been updated.")
     else:
         messages.error(request, "Invalid status.")
 
-    return redirect("pages:manage_orders")
+    return _manage_orders_redirect(request)
+
+
+@login_required
+@require_POST
+def manage_orders_bulk_status(request):
+    if not is_manager(request.user):
+        return HttpResponseForbidden("Forbidden")
+
+    new_status = request.POST.get("status", "").strip()
+    order_ids = {int(value) for value in request.POST.getlist("order_ids") if value.isdigit()}
+    valid_statuses = {choice for choice, _ in Order.Status.choices}
+    if new_status not in valid_statuses:
+        messages.error(request, "Invalid status.")
+    elif not order_ids:
+        messages.error(request, "Select at least one order.")
+    elif len(order_ids) > ORDERS_BULK_MAX:
+        messages.error(request, f"Select at most {ORDERS_BULK_MAX} orders at a time.")
+    else:
+        updated = transition_orders(order_ids, new_status, changed_by=request.user)
+        messages.success(request, f"Updated {updated} orders.")
+
+    return _manage_orders_redirect(request)
 
 
 def contact(request):
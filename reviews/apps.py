@@ -4,3 +4,39 @@ from django.apps import AppConfig
 class ReviewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reviews"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_init, post_save
+
+        from . import signals
+        from .models import Review
+
+        post_init.connect(
+            signals.remember_rating, sender=Review, dispatch_uid="reviews.remember_rating"
+        )
+        post_save.connect(
+            signals.update_rating_stats_on_save,
+            sender=Review,
+            dispatch_uid="reviews.rating_stats_saved",
+        )
+        post_delete.connect(
+            signals.update_rating_stats_on_delete,
+            sender=Review,
+            dispatch_uid="reviews.rating_stats_deleted",
+        )
+        post_save.connect(
+            signals.product_page_changed,
+            sender=Review,
+            dispatch_uid="reviews.product_page_saved",
+        )
+        post_delete.connect(
+            signals.product_page_changed,
+            sender=Review,
+            dispatch_uid="reviews.product_page_deleted",
+        )
+        post_save.connect(
+            signals.reviews_changed, sender=Review, dispatch_uid="reviews.version.review_saved"
+        )
+        post_delete.connect(
+            signals.reviews_changed, sender=Review, dispatch_uid="reviews.version.review_deleted"
+        )
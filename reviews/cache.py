@@ -0,0 +1,17 @@
+from core.utils.cache import bump_version_on_commit, get_changed_at, get_version
+
+
+def reviews_namespace(game_id):
+    return f"reviews:{game_id}"
+
+
+def reviews_version(game_id):
+    return get_version(reviews_namespace(game_id))
+
+
+def reviews_changed_at(game_id):
+    return get_changed_at(reviews_namespace(game_id))
+
+
+def bump_reviews_version(game_id):
+    bump_version_on_commit(reviews_namespace(game_id))
@@ -0,0 +1,38 @@
+from catalog.pagination import keyset_paginate
+
+from .models import Review
+
+REVIEWS_PER_PAGE = 10
+
+REVIEW_SORTS = {
+    "newest": ("created_at", True),
+    "highest": ("rating", True),
+    "lowest": ("rating", False),
+}
+DEFAULT_REVIEW_SORT = "newest"
+
+
+def resolve_review_sort(sort):
+    return sort if sort in REVIEW_SORTS else DEFAULT_REVIEW_SORT
+
+
+def review_page(game, sort=DEFAULT_REVIEW_SORT, cursor=None, per_page=REVIEWS_PER_PAGE):
+    # The stored reviews_count stands in for COUNT(*), so a page is a single query.
+    queryset = Review.objects.filter(game=game).select_related("user")
+    ordering = REVIEW_SORTS[resolve_review_sort(sort)]
+    return keyset_paginate(queryset, ordering, per_page, cursor=cursor, total=game.reviews_count)
+
+
+def own_review(game, user):
+    if not user.is_authenticated:
+        return None
+    return Review.objects.filter(game=game, user=user).select_related("user").first()
+
+
+def serialize_review(review):
+    return {
+        "username": review.user.username,
+        "rating": review.rating,
+        "text": review.text,
+        "created_at": review.created_at.isoformat(),
+    }
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.stats import rebuild_rating_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored rating totals and histograms on games from their reviews."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        updated = rebuild_rating_stats()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled rating stats for {updated} games."))
@@ -0,0 +1,41 @@
+from django.db import migrations
+from django.db.models import Count, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def populate_rating_stats(apps, schema_editor):
+    Game = apps.get_model("catalog", "Game")
+    Review = apps.get_model("reviews", "Review")
+
+    reviews = Review.objects.filter(game=OuterRef("pk")).order_by().values("game")
+    rating_sum = Coalesce(
+        Subquery(reviews.annotate(total=Sum("rating")).values("total")[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    reviews_count = Coalesce(
+        Subquery(reviews.annotate(total=Count("id")).values("total")[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    Game.objects.update(
+        rating_sum=rating_sum,
+        reviews_count=reviews_count,
+        average_rating=Coalesce(
+            Cast(rating_sum, FloatField()) / NullIf(reviews_count, Value(0)),
+            Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_game_rating_stats"),
+        ("reviews", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_rating_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_game_keyset_indexes"),
+        ("reviews", "0002_populate_game_rating_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(fields=["game", "created_at", "id"], name="review_game_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(fields=["game", "rating", "id"], name="review_game_rating_idx"),
+        ),
+    ]
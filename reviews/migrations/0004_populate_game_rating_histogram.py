@@ -0,0 +1,29 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_rating_histogram(apps, schema_editor):
+    Game = apps.get_model("catalog", "Game")
+    Review = apps.get_model("reviews", "Review")
+
+    reviews = Review.objects.filter(game=OuterRef("pk")).order_by().values("game")
+    histogram = {}
+    for rating in range(1, 6):
+        counts = reviews.annotate(total=Count("id", filter=Q(rating=rating))).values("total")
+        histogram[f"rating_{rating}_count"] = Coalesce(
+            Subquery(counts[:1]), Value(0), output_field=IntegerField()
+        )
+    Game.objects.update(**histogram)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0012_game_rating_histogram"),
+        ("reviews", "0003_review_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_rating_histogram, migrations.RunPython.noop),
+    ]
@@ -16,6 +16,10 @@ class Review(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["user", "game"], name="review_user_game_unique"),
         ]
+        indexes = [
+            models.Index(fields=["game", "created_at", "id"], name="review_game_created_idx"),
+            models.Index(fields=["game", "rating", "id"], name="review_game_rating_idx"),
+        ]
         ordering = ["-created_at"]
 
     def __str__(self):
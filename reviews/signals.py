@@ -0,0 +1,41 @@
+from catalog.cache import bump_product_version
+from catalog.models import Game
+
+from .cache import bump_reviews_version
+from .stats import apply_rating_change, rebuild_rating_stats
+
+
+def remember_rating(sender, instance, **kwargs):
+    instance._stats_rating = instance.__dict__.get("rating") if instance.pk else None
+
+
+def update_rating_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_rating_change(instance.game_id, new_rating=instance.rating)
+    elif getattr(instance, "_stats_rating", None) is None:
+        rebuild_rating_stats(Game.objects.filter(pk=instance.game_id))
+    else:
+        apply_rating_change(instance.game_id, instance._stats_rating, instance.rating)
+    instance._stats_rating = instance.rating
+
+
+def update_rating_stats_on_delete(sender, instance, **kwargs):
+    old_rating = getattr(instance, "_stats_rating", None)
+    apply_rating_change(
+        instance.game_id,
+        old_rating=old_rating if old_rating is not None else instance.rating,
+    )
+
+
+def product_page_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_product_version(instance.game_id)
+
+
+def reviews_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_reviews_version(instance.game_id)
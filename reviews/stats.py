@@ -0,0 +1,87 @@
+from django.db.models import (
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from catalog.models import Game
+from catalog.snapshot import games_changed, invalidate_snapshot
+
+from .models import Review
+
+RATING_VALUES = range(1, 6)
+
+
+def average_rating_expression(rating_sum, reviews_count):
+    return Coalesce(
+        Cast(rating_sum, FloatField()) / NullIf(reviews_count, Value(0)),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def histogram_field(rating):
+    return f"rating_{rating}_count"
+
+
+def apply_rating_change(game_id, old_rating=None, new_rating=None):
+    rating_delta = (new_rating or 0) - (old_rating or 0)
+    count_delta = int(new_rating is not None) - int(old_rating is not None)
+    if not rating_delta and not count_delta:
+        return
+
+    rating_sum = F("rating_sum") + rating_delta
+    reviews_count = F("reviews_count") + count_delta
+    histogram = {}
+    if old_rating is not None:
+        histogram[histogram_field(old_rating)] = F(histogram_field(old_rating)) - 1
+    if new_rating is not None:
+        histogram[histogram_field(new_rating)] = F(histogram_field(new_rating)) + 1
+    Game.objects.filter(pk=game_id).update(
+        rating_sum=rating_sum,
+        reviews_count=reviews_count,
+        average_rating=average_rating_expression(rating_sum, reviews_count),
+        **histogram,
+    )
+    # Listing validators and cached totals follow the snapshot version, so the catalog version
+    # stays put and other processes patch this game from the change log instead of rebuilding.
+    games_changed([game_id])
+
+
+def rebuild_rating_stats(queryset=None):
+    games_qs = queryset if queryset is not None else Game.objects.all()
+    reviews = Review.objects.filter(game=OuterRef("pk")).order_by().values("game")
+    rating_sum = Coalesce(
+        Subquery(reviews.annotate(total=Sum("rating")).values("total")[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    reviews_count = Coalesce(
+        Subquery(reviews.annotate(total=Count("id")).values("total")[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    histogram = {}
+    for rating in RATING_VALUES:
+        counts = reviews.annotate(total=Count("id", filter=Q(rating=rating))).values("total")
+        histogram[histogram_field(rating)] = Coalesce(
+            Subquery(counts[:1]), Value(0), output_field=IntegerField()
+        )
+    updated = games_qs.update(
+        rating_sum=rating_sum,
+        reviews_count=reviews_count,
+        average_rating=average_rating_expression(rating_sum, reviews_count),
+        **histogram,
+    )
+    if queryset is None:
+        invalidate_snapshot()
+    else:
+        games_changed(games_qs.values_list("pk", flat=True))
+    return updated
@@ -0,0 +1,168 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog import snapshot
+from catalog.cache import catalog_version
+from catalog.facets import facet_counts
+from catalog.models import Game
+from catalog.pagination import encode_cursor
+from core.testing import ConcurrencyMixin
+from reviews.feed import REVIEW_SORTS
+from reviews.models import Review
+from reviews.stats import rebuild_rating_stats
+from reviews.writes import upsert_review
+
+
+def create_game():
+    return Game.objects.create(
+        title="Game", description="x", price=Decimal("9.99"), release_year=2020
+    )
+
+
+def rating_stats(game):
+    game = Game.objects.get(pk=game.pk)
+    return game.reviews_count, game.rating_sum, game.average_rating, game.rating_histogram
+
+
+class ReviewUpsertTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.game = create_game()
+        self.users = [User.objects.create(username=f"reviewer-{index}") for index in range(2)]
+
+    def test_insert_and_update_apply_stat_deltas(self):
+        first, second = self.users
+        result = upsert_review(first, self.game, 4, "good")
+        self.assertEqual(
+            (result["created"], result["old_rating"], result["reviews_count"]), (True, None, 1)
+        )
+        result = upsert_review(first, self.game, 2, "changed my mind")
+        self.assertEqual(
+            (result["created"], result["old_rating"], result["reviews_count"]), (False, 4, 1)
+        )
+        self.assertEqual(result["average_rating"], 2.0)
+        self.assertEqual(Review.objects.get().text, "changed my mind")
+        upsert_review(second, self.game, 5, "great")
+
+        reviews_count, rating_sum, average, histogram = rating_stats(self.game)
+        self.assertEqual((reviews_count, rating_sum, average), (2, 7, 3.5))
+        self.assertEqual(dict(histogram), {5: 1, 4: 0, 3: 0, 2: 1, 1: 0})
+        expected = rating_stats(self.game)
+        rebuild_rating_stats()
+        self.assertEqual(rating_stats(self.game), expected)
+
+    def test_insert_and_update_run_the_same_statements(self):
+        statements = []
+        for rating in (3, 5):
+            with CaptureQueriesContext(connection) as queries:
+                upsert_review(self.users[0], self.game, rating, "text")
+            statements.append(len(queries))
+            self.assertEqual(
+                sum("ON CONFLICT" in query["sql"] for query in queries.captured_queries), 1
+            )
+        self.assertEqual(statements[0], statements[1])
+
+
+class ConcurrentReviewTests(ConcurrencyMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.game = create_game()
+
+    def test_duplicate_submissions_keep_one_review(self):
+        user = User.objects.create(username="reviewer")
+        self.run_in_parallel(
+            lambda rating: upsert_review(user, self.game, rating, f"rated {rating}"),
+            [index % 5 + 1 for index in range(self.workers)],
+        )
+        review = Review.objects.get()
+        reviews_count, rating_sum, _, histogram = rating_stats(self.game)
+        self.assertEqual((reviews_count, rating_sum), (1, review.rating))
+        self.assertEqual(sum(count for _, count in histogram), 1)
+
+    def test_parallel_reviewers_are_all_counted(self):
+        users = [User.objects.create(username=f"reviewer-{index}") for index in range(self.workers)]
+        self.run_in_parallel(lambda user: upsert_review(user, self.game, 4, "good"), users)
+        reviews_count, rating_sum, average, _ = rating_stats(self.game)
+        self.assertEqual((reviews_count, rating_sum, average), (self.workers, 4 * self.workers, 4))
+
+
+class ReviewSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        snapshot.invalidate_snapshot()
+        self.user = User.objects.create_user("reviewer", password="secret")
+        self.game = create_game()
+        facet_counts()
+
+    def test_review_writes_patch_rating_counts_without_a_rebuild(self):
+        with mock.patch.object(snapshot.CatalogSnapshot, "build") as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                upsert_review(self.user, self.game, 5, "great")
+            self.assertEqual(facet_counts()["rating"]["4.5"], 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                review = Review.objects.only("id", "game", "text").get(user=self.user)
+                review.rating = 2
+                review.save()
+            counts = facet_counts()["rating"]
+            self.assertEqual((counts["4.5"], counts["2"]), (0, 1))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Review.objects.get(user=self.user).delete()
+            self.assertEqual(facet_counts()["rating"]["1"], 0)
+        build.assert_not_called()
+
+    def test_review_writes_keep_the_catalog_version(self):
+        url = reverse("api_app:api_games_list")
+        etag = self.client.get(url)["ETag"]
+        version = catalog_version()
+        with mock.patch.object(snapshot.CatalogSnapshot, "build") as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                upsert_review(self.user, self.game, 4, "good")
+            self.assertEqual(catalog_version(), version)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        build.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["items"][0]["average_rating"], 4.0)
+        self.assertEqual(response.json()["data"]["facets"]["rating"]["4"], 1)
+
+
+class ReviewFeedTests(TestCase):
+    def setUp(self):
+        self.game = create_game()
+        for index in range(25):
+            user = User.objects.create(username=f"reviewer-{index}")
+            upsert_review(user, self.game, index % 5 + 1, f"review {index}")
+        self.url = reverse("api_app:api_game_reviews", args=[self.game.slug])
+
+    def walk(self, sort):
+        seen = []
+        params = {"sort": sort}
+        while True:
+            data = self.client.get(self.url, params).json()["data"]
+            seen.extend(review["text"] for review in data["items"])
+            if not data["pagination"]["next"]:
+                return seen
+            params = {"sort": sort, "cursor": data["pagination"]["next"]}
+
+    def test_each_sort_walks_every_review_once(self):
+        for sort in REVIEW_SORTS:
+            seen = self.walk(sort)
+            self.assertEqual(len(seen), 25, sort)
+            self.assertEqual(len(set(seen)), 25, sort)
+
+    def test_cursor_from_another_sort_starts_over(self):
+        first = self.client.get(self.url, {"sort": "highest"}).json()["data"]["items"]
+        cursor = self.client.get(self.url, {"sort": "newest"}).json()["data"]["pagination"]["next"]
+        forged = encode_cursor(REVIEW_SORTS["highest"], "abc", 1, "next", 2)
+        for cursor in (cursor, forged):
+            response = self.client.get(self.url, {"sort": "highest", "cursor": cursor})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["data"]["items"], first)
@@ -0,0 +1,80 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from catalog.cache import bump_product_version
+from catalog.models import Game
+
+from .cache import bump_reviews_version
+from .models import Review
+from .stats import apply_rating_change, rebuild_rating_stats
+
+
+def _upsert_sql(returning):
+    meta = Review._meta
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    fields = ("user", "game", "rating", "text", "created_at")
+    columns = ", ".join(quote(meta.get_field(name).column) for name in fields)
+    conflict = ", ".join(quote(meta.get_field(name).column) for name in ("user", "game"))
+    rating = quote(meta.get_field("rating").column)
+    text = quote(meta.get_field("text").column)
+    return (
+        f"INSERT INTO {table} AS review ({columns}) VALUES (%s, %s, %s, %s, %s) "
+        f"ON CONFLICT ({conflict}) DO UPDATE "
+        f"SET {rating} = EXCLUDED.{rating}, {text} = EXCLUDED.{text} "
+        f"RETURNING {returning}"
+    )
+
+
+def _postgresql_upsert(params):
+    table = connection.ops.quote_name(Review._meta.db_table)
+    # Sub-selects in RETURNING read the statement's snapshot, i.e. the row before the update.
+    sql = _upsert_sql(
+        f"review.id, (SELECT previous.rating FROM {table} AS previous "
+        f"WHERE previous.id = review.id), review.xmax = 0"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        review_id, old_rating, created = cursor.fetchone()
+    # A row inserted concurrently after our snapshot is updated but has no visible old rating.
+    return review_id, old_rating, created or old_rating is not None
+
+
+def _sqlite_upsert(params, user_id, game_id):
+    # SQLite serializes writers and fails a transaction whose read went stale, so reading
+    # the old rating first inside the same transaction cannot double count.
+    old_rating = (
+        Review.objects.filter(user_id=user_id, game_id=game_id)
+        .values_list("rating", flat=True)
+        .first()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(_upsert_sql("id"), params)
+        (review_id,) = cursor.fetchone()
+    return review_id, old_rating, True
+
+
+def upsert_review(user, game, rating, text):
+    created_at = Review._meta.get_field("created_at").get_db_prep_value(
+        timezone.now(), connection
+    )
+    params = [user.pk, game.pk, rating, text, created_at]
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            review_id, old_rating, consistent = _postgresql_upsert(params)
+        else:
+            review_id, old_rating, consistent = _sqlite_upsert(params, user.pk, game.pk)
+        if consistent:
+            apply_rating_change(game.pk, old_rating, rating)
+        else:
+            rebuild_rating_stats(Game.objects.filter(pk=game.pk))
+        bump_product_version(game.pk)
+        bump_reviews_version(game.pk)
+        stats = Game.objects.filter(pk=game.pk).values("average_rating", "reviews_count").get()
+    return {
+        "review_id": review_id,
+        "created": old_rating is None and consistent,
+        "old_rating": old_rating,
+        "average_rating": float(stats["average_rating"] or 0),
+        "reviews_count": int(stats["reviews_count"] or 0),
+    }
@@ -0,0 +1,41 @@
+(function () {
+  "use strict";
+
+  var page = document.querySelector("[data-product-page]");
+  if (!page) {
+    return;
+  }
+
+  var token = page.getAttribute("data-csrf-token") || "";
+  page.querySelectorAll("[data-csrf-input]").forEach(function (input) {
+    input.value = token;
+  });
+
+  if (!page.classList.contains("is-user")) {
+    return;
+  }
+
+  fetch(page.getAttribute("data-overlay-url"), { credentials: "same-origin" })
+    .then(function (response) {
+      return response.json();
+    })
+    .then(function (payload) {
+      if (!payload || !payload.ok) {
+        return;
+      }
+
+      var button = page.querySelector("[data-favorite-toggle]");
+      if (button && payload.data.is_favorite) {
+        button.textContent = button.getAttribute("data-added-text") || "Remove from favorites";
+      }
+
+      var review = payload.data.user_review;
+      var form = page.querySelector("[data-review-form]");
+      if (review && form) {
+        form.querySelector("select[name='rating']").value = String(review.rating);
+        var textarea = form.querySelector("textarea[name='text']");
+        textarea.value = review.text;
+        textarea.dispatchEvent(new Event("input"));
+      }
+    });
+})();
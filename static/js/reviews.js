@@ -0,0 +1,83 @@
+(function () {
+  "use strict";
+
+  var list = document.querySelector("[data-reviews-list]");
+  var more = document.querySelector("[data-reviews-more]");
+  if (!list || !more) {
+    return;
+  }
+
+  var sortSelect = document.querySelector("[data-reviews-sort]");
+  var url = list.getAttribute("data-url");
+  var sort = "newest";
+
+  function renderReview(review) {
+    var item = document.createElement("div");
+    item.className = "list-group-item mb-2";
+
+    var header = document.createElement("div");
+    var name = document.createElement("strong");
+    name.textContent = review.username;
+    header.appendChild(name);
+    header.appendChild(document.createTextNode(" - " + review.rating + "/5"));
+
+    var text = document.createElement("div");
+    text.textContent = review.text;
+
+    var date = document.createElement("small");
+    date.textContent = new Date(review.created_at).toLocaleString();
+
+    item.appendChild(header);
+    item.appendChild(text);
+    item.appendChild(date);
+    return item;
+  }
+
+  function load(cursor, replace) {
+    // Cursors belong to the sort they were issued under; drop answers for an older sort.
+    var requestedSort = sort;
+    var params = new URLSearchParams({ sort: sort });
+    if (cursor) {
+      params.set("cursor", cursor);
+    }
+
+    more.disabled = true;
+    fetch(url + "?" + params.toString(), { credentials: "same-origin" })
+      .then(function (response) {
+        return response.json();
+      })
+      .then(function (payload) {
+        if (!payload || !payload.ok || requestedSort !== sort) {
+          return;
+        }
+        if (replace) {
+          list.innerHTML = "";
+        }
+        payload.data.items.forEach(function (review) {
+          list.appendChild(renderReview(review));
+        });
+
+        var next = payload.data.pagination.next;
+        more.setAttribute("data-cursor", next || "");
+        more.classList.toggle("d-none", !next);
+      })
+      .finally(function () {
+        more.disabled = false;
+      });
+  }
+
+  more.addEventListener("click", function () {
+    var cursor = more.getAttribute("data-cursor");
+    if (cursor) {
+      load(cursor, false);
+    }
+  });
+
+  if (sortSelect) {
+    sortSelect.addEventListener("change", function () {
+      sort = sortSelect.value;
+      more.setAttribute("data-cursor", "");
+      load("", true);
+    });
+  }
+})();
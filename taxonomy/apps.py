@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class TaxonomyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "taxonomy"
+
+    def ready(self):
+        from django.db.models.signals import post_delete
+
+        from . import signals
+        from .models import Genre, Platform, Tag
+
+        # Saves bump the version in SluggedNameModel.save; queryset deletes skip delete().
+        for model in (Genre, Platform, Tag):
+            post_delete.connect(
+                signals.taxonomy_deleted,
+                sender=model,
+                dispatch_uid=f"taxonomy.version.{model._meta.label_lower}_deleted",
+            )
@@ -0,0 +1,19 @@
+from core.utils.cache import bump_version_on_commit, cached_lookup, get_changed_at, get_version
+
+TAXONOMY_NAMESPACE = "taxonomy"
+
+
+def taxonomy_version():
+    return get_version(TAXONOMY_NAMESPACE)
+
+
+def taxonomy_changed_at():
+    return get_changed_at(TAXONOMY_NAMESPACE)
+
+
+def bump_taxonomy_version():
+    bump_version_on_commit(TAXONOMY_NAMESPACE)
+
+
+def taxonomy_options(model):
+    return cached_lookup(TAXONOMY_NAMESPACE, model)
@@ -2,6 +2,8 @@ from django.db import models
 
 from core.utils.slug import generate_unique_slug
 
+from .cache import bump_taxonomy_version
+
 
 class SluggedNameModel(models.Model):
     name = models.CharField(max_length=120, unique=True)
@@ -15,6 +17,7 @@ class SluggedNameModel(models.Model):
         if not self.slug:
             self.slug = generate_unique_slug(self, self.name)
         super().save(*args, **kwargs)
+        bump_taxonomy_version()
 
     def __str__(self):
         return self.name
@@ -0,0 +1,5 @@
+from .cache import bump_taxonomy_version
+
+
+def taxonomy_deleted(sender, **kwargs):
+    bump_taxonomy_version()